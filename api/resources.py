@@ -0,0 +1,155 @@
+from django.db.models import Prefetch
+
+from core.dates import filter_day_range
+from core.models import Band, Concert, Performance, Rehearsal
+
+
+class ApiField:
+    """
+    Поле ответа API.
+
+    columns — столбцы для only(), select / prefetch — связи, которые нужно
+    загрузить заранее, если поле запрошено.
+    """
+
+    def __init__(self, value, columns=(), select=(), prefetch=()):
+        self.value = value
+        self.columns = columns
+        self.select = select
+        self.prefetch = prefetch
+
+
+class ApiResource:
+    def __init__(self, model, fields, default_fields, ordering, filters=None):
+        self.model = model
+        self.fields = fields
+        self.default_fields = default_fields
+        self.ordering = ordering
+        self.filters = filters or {}
+
+    def parse_fields(self, raw):
+        """Список полей из ?fields=a,b; ValueError для неизвестных имён."""
+        if not raw:
+            return list(self.default_fields)
+        names = list(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ValueError(f"Неизвестные поля: {', '.join(unknown)}")
+        return names
+
+    def queryset(self, names, params=None):
+        """
+        Запрос только под запрошенные поля: лишние столбцы не читаются,
+        связи подтягиваются через select_related/prefetch_related.
+        """
+        fields = [self.fields[name] for name in names]
+        columns = {self.model._meta.pk.name}
+        columns.update(name.lstrip('-') for name in self.ordering)
+        select, prefetch = [], []
+        for field in fields:
+            columns.update(field.columns)
+            select.extend(path for path in field.select if path not in select)
+            prefetch.extend(lookup for lookup in field.prefetch if lookup not in prefetch)
+
+        queryset = self.model.objects.only(*columns)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+
+        for name, apply_filter in self.filters.items():
+            value = (params or {}).get(name)
+            if value:
+                queryset = apply_filter(queryset, value)
+        return queryset
+
+    def serialize(self, obj, names):
+        return {name: self.fields[name].value(obj) for name in names}
+
+
+def int_filter(lookup):
+    def apply_filter(queryset, value):
+        if not str(value).isdigit():
+            return queryset
+        return queryset.filter(**{lookup: int(value)})
+    return apply_filter
+
+
+def date_filter(field, bound):
+    def apply_filter(queryset, value):
+        return filter_day_range(queryset, field, **{bound: value})
+    return apply_filter
+
+
+def logo_url(band):
+    return band.logo.url if band.logo else None
+
+
+LINEUP = Prefetch(
+    'performance_set',
+    queryset=Performance.objects.select_related('band')
+    .only('performance_id', 'performance_order', 'concert', 'band__band_id', 'band__band_name')
+    .order_by('performance_order'),
+    to_attr='lineup',
+)
+
+
+API_RESOURCES = {
+    'concerts': ApiResource(
+        Concert,
+        fields={
+            'id': ApiField(lambda concert: concert.pk),
+            'title': ApiField(lambda concert: concert.concert_title, columns=('concert_title',)),
+            'venue': ApiField(lambda concert: concert.venue_address, columns=('venue_address',)),
+            'date': ApiField(lambda concert: concert.concert_date),
+            'lineup': ApiField(
+                lambda concert: [
+                    {'order': p.performance_order, 'band_id': p.band_id, 'band': p.band.band_name}
+                    for p in concert.lineup
+                ],
+                prefetch=(LINEUP,),
+            ),
+        },
+        default_fields=('id', 'title', 'venue', 'date'),
+        ordering=('-concert_date', '-concert_id'),
+        filters={
+            'from': date_filter('concert_date', 'date_from'),
+            'to': date_filter('concert_date', 'date_to'),
+        },
+    ),
+    'bands': ApiResource(
+        Band,
+        fields={
+            'id': ApiField(lambda band: band.pk),
+            'name': ApiField(lambda band: band.band_name, columns=('band_name',)),
+            'genre': ApiField(lambda band: band.genre, columns=('genre',)),
+            'founded': ApiField(lambda band: band.founded_date, columns=('founded_date',)),
+            'logo': ApiField(logo_url, columns=('logo',)),
+        },
+        default_fields=('id', 'name', 'genre'),
+        ordering=('band_name', 'band_id'),
+        filters={'genre': lambda queryset, value: queryset.filter(genre=value)},
+    ),
+    'rehearsals': ApiResource(
+        Rehearsal,
+        fields={
+            'id': ApiField(lambda rehearsal: rehearsal.pk),
+            'band_id': ApiField(lambda rehearsal: rehearsal.band_id, columns=('band',)),
+            'band': ApiField(
+                lambda rehearsal: rehearsal.band.band_name,
+                columns=('band', 'band__band_name'),
+                select=('band',),
+            ),
+            'start': ApiField(lambda rehearsal: rehearsal.rehearsal_date),
+            'duration': ApiField(lambda rehearsal: rehearsal.duration_minutes, columns=('duration_minutes',)),
+            'location': ApiField(lambda rehearsal: rehearsal.location, columns=('location',)),
+        },
+        default_fields=('id', 'band', 'start', 'duration', 'location'),
+        ordering=('rehearsal_date', 'rehearsal_id'),
+        filters={
+            'band': int_filter('band_id'),
+            'from': date_filter('rehearsal_date', 'date_from'),
+            'to': date_filter('rehearsal_date', 'date_to'),
+        },
+    ),
+}
@@ -0,0 +1,61 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Band, Concert, Performance, Rehearsal
+
+
+class ApiTests(TestCase):
+    def setUp(self):
+        self.bands = [Band.objects.create(band_name=f"Band {i}", genre="rock") for i in range(3)]
+        start = timezone.now() + timezone.timedelta(days=1)
+        for i in range(5):
+            concert = Concert.objects.create(
+                concert_title=f"Fest {i}", venue_address="Minsk",
+                concert_date=start + timezone.timedelta(days=i),
+            )
+            for order, band in enumerate(self.bands, start=1):
+                Performance.objects.create(concert=concert, band=band, performance_order=order)
+            Rehearsal.objects.create(
+                band=self.bands[i % 3], rehearsal_date=start + timezone.timedelta(hours=i),
+                duration_minutes=60, location=f"Studio {i}",
+            )
+
+    def get(self, resource, **params):
+        return self.client.get(reverse('api:list', args=[resource]), params)
+
+    def test_sparse_fieldset_with_lineup_uses_two_queries(self):
+        with self.assertNumQueries(2):
+            data = self.get('concerts', fields='title,lineup', limit=2).json()
+        self.assertEqual(set(data['results'][0]), {'title', 'lineup'})
+        self.assertEqual(data['results'][0]['title'], "Fest 4")
+        self.assertEqual([p['band'] for p in data['results'][0]['lineup']], ["Band 0", "Band 1", "Band 2"])
+
+    def test_sparse_fieldset_reads_only_requested_columns(self):
+        with self.assertNumQueries(1) as ctx:
+            self.get('concerts', fields='id')
+        self.assertNotIn('venue_address', ctx.captured_queries[0]['sql'])
+
+    def test_rehearsal_band_is_joined(self):
+        with self.assertNumQueries(1):
+            data = self.get('rehearsals', fields='band,start', band=self.bands[0].pk).json()
+        self.assertEqual([r['band'] for r in data['results']], ["Band 0", "Band 0"])
+
+    def test_keyset_pages(self):
+        first = self.get('bands', limit=2).json()
+        second = self.get('bands', limit=2, cursor=first['next']).json()
+        self.assertEqual([b['name'] for b in first['results'] + second['results']], ["Band 0", "Band 1", "Band 2"])
+        self.assertIsNone(second['next'])
+
+    def test_unknown_field_and_resource(self):
+        self.assertEqual(self.get('bands', fields='name,secret').status_code, 400)
+        self.assertEqual(self.get('secrets').status_code, 404)
+
+    def test_export_streams_everything(self):
+        response = self.client.get(reverse('api:export', args=['concerts']), {'fields': 'id,lineup'})
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(data), 5)
+        self.assertEqual(len(data[0]['lineup']), 3)
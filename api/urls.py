@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('<slug:resource>/', views.resource_list, name='list'),
+    path('<slug:resource>/export/', views.resource_export, name='export'),
+]
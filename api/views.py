@@ -0,0 +1,74 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from core.pagination import KeysetPaginator
+from core.views import int_param
+from .resources import API_RESOURCES
+
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+EXPORT_CHUNK_SIZE = 500
+
+
+def get_resource(name):
+    resource = API_RESOURCES.get(name)
+    if resource is None:
+        raise Http404
+    return resource
+
+
+def stream_json_array(objects, serialize, batch=100):
+    """JSON-массив по частям: в памяти одновременно не больше batch объектов."""
+    yield '['
+    buffer, first = [], True
+    for obj in objects:
+        buffer.append(json.dumps(serialize(obj), cls=DjangoJSONEncoder, ensure_ascii=False))
+        if len(buffer) >= batch:
+            yield ('' if first else ',') + ','.join(buffer)
+            buffer, first = [], False
+    if buffer:
+        yield ('' if first else ',') + ','.join(buffer)
+    yield ']'
+
+
+@require_GET
+def resource_list(request, resource):
+    resource = get_resource(resource)
+    try:
+        names = resource.parse_fields(request.GET.get('fields'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    paginator = KeysetPaginator(
+        resource.queryset(names, request.GET),
+        resource.ordering,
+        int_param(request, 'limit', API_PAGE_SIZE, API_MAX_PAGE_SIZE) or API_PAGE_SIZE,
+    )
+    page = paginator.get_page(request.GET.get('cursor'))
+    return JsonResponse({
+        'results': [resource.serialize(obj, names) for obj in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    }, json_dumps_params={'ensure_ascii': False})
+
+
+@require_GET
+def resource_export(request, resource):
+    resource = get_resource(resource)
+    try:
+        names = resource.parse_fields(request.GET.get('fields'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    objects = (
+        resource.queryset(names, request.GET)
+        .order_by(*resource.ordering)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    return StreamingHttpResponse(
+        stream_json_array(objects, lambda obj: resource.serialize(obj, names)),
+        content_type='application/json',
+    )
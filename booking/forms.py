@@ -1,17 +1,37 @@
-from core.models import Rehearsal, Band
-from django.forms import ModelForm, TextInput, DateTimeInput, NumberInput, Select
+from core.models import Rehearsal
+from django import forms
+from django.forms import ModelForm, TextInput, DateTimeInput, DateInput, NumberInput, Select
+from django.utils import timezone
+from core.widgets import AutocompleteSelect
+from .series import MAX_OCCURRENCES
+from .slots import MAX_RANGE_DAYS
 
 
 class RehearsalsForm(ModelForm):
+    RECURRENCE_CHOICES = [
+        ("", "Не повторять"),
+        ("weekly", "Каждую неделю"),
+        ("biweekly", "Раз в две недели"),
+    ]
+
+    recurrence = forms.ChoiceField(
+        choices=RECURRENCE_CHOICES,
+        required=False,
+        widget=Select(attrs={"class": "form-control"}),
+    )
+    repeat_until = forms.DateField(
+        required=False,
+        widget=DateInput(attrs={"class": "form-control", "type": "date"}),
+    )
+
     class Meta():
         model = Rehearsal
         fields = ["band", "rehearsal_date", "duration_minutes", "location"]
 
         widgets = {            
-            "band": Select(attrs={
-                "class": "form-control",
+            "band": AutocompleteSelect("bands", attrs={
                 "placeholder": "Выберите группу"
-            }), 
+            }),
             "rehearsal_date": DateTimeInput(attrs={
                 "class": "form-control",
                 "placeholder": "Выберите дату и время",
@@ -29,6 +49,39 @@ class RehearsalsForm(ModelForm):
     
     def __init__(self, *args, **kwargs):
         super(RehearsalsForm, self).__init__(*args, **kwargs)
-        # Заменяем поле выбора группы на queryset с названиями групп
-        self.fields['band'].queryset = Band.objects.all()
-        self.fields['band'].label_from_instance = lambda obj: obj.band_name
\ No newline at end of file
+        # Варианты группы подгружает автодополнение, здесь только подпись
+        self.fields['band'].label_from_instance = lambda obj: obj.band_name
+
+    def clean(self):
+        cleaned_data = super().clean()
+        recurrence = cleaned_data.get("recurrence")
+        repeat_until = cleaned_data.get("repeat_until")
+        rehearsal_date = cleaned_data.get("rehearsal_date")
+
+        if recurrence:
+            if not repeat_until:
+                self.add_error("repeat_until", "Укажите дату окончания серии")
+            elif rehearsal_date and repeat_until < timezone.localtime(rehearsal_date).date():
+                self.add_error("repeat_until", "Дата окончания серии раньше первой репетиции")
+            elif rehearsal_date and (repeat_until - timezone.localtime(rehearsal_date).date()).days > 7 * MAX_OCCURRENCES:
+                self.add_error("repeat_until", f"Серия не может быть длиннее {MAX_OCCURRENCES} недель")
+        return cleaned_data
+
+
+class FreeSlotsForm(forms.Form):
+    location = forms.CharField(required=False, max_length=255)
+    date_from = forms.DateField()
+    date_to = forms.DateField(required=False)
+    duration = forms.IntegerField(min_value=15, max_value=480)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get('date_from')
+        date_to = cleaned_data.get('date_to') or date_from
+        if date_from and date_to:
+            if date_to < date_from:
+                raise forms.ValidationError('Дата окончания раньше даты начала')
+            if (date_to - date_from).days >= MAX_RANGE_DAYS:
+                raise forms.ValidationError(f'Период поиска не может превышать {MAX_RANGE_DAYS} дней')
+        cleaned_data['date_to'] = date_to
+        return cleaned_data
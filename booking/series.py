@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.conflicts import rehearsal_end, rehearsals_in_range
+from core.locks import advisory_xact_lock, rehearsal_lock_keys
+from core.models import Rehearsal
+from core.versioning import bump_versions
+from .slots import invalidate_slots
+
+RECURRENCE_STEPS = {
+    'weekly': timedelta(weeks=1),
+    'biweekly': timedelta(weeks=2),
+}
+MAX_OCCURRENCES = 52
+
+
+def expand_occurrences(start, recurrence, until):
+    """
+    Даты серии от start до until включительно.
+
+    Шаг считается по местному времени, чтобы репетиция оставалась
+    в тот же час и после перехода на летнее/зимнее время.
+    """
+    step = RECURRENCE_STEPS[recurrence]
+    tz = timezone.get_current_timezone()
+    local = timezone.localtime(start, tz).replace(tzinfo=None)
+    occurrences = []
+    while local.date() <= until and len(occurrences) < MAX_OCCURRENCES:
+        occurrences.append(timezone.make_aware(local, tz))
+        local += step
+    return occurrences
+
+
+def create_series(band, start, duration_minutes, location, recurrence, until):
+    """
+    Создаёт серию репетиций одним bulk_create.
+
+    Занятость проверяется одним запросом на весь диапазон серии под
+    блокировками места и группы; занятые даты пропускаются.
+    Возвращает (созданные, [(дата, причина), ...]).
+    """
+    occurrences = expand_occurrences(start, recurrence, until)
+    if not occurrences:
+        return [], []
+
+    with transaction.atomic():
+        advisory_xact_lock(*rehearsal_lock_keys(band.pk, location))
+        busy = list(rehearsals_in_range(
+            occurrences[0], rehearsal_end(occurrences[-1], duration_minutes),
+            band=band, location=location,
+        ).values_list('band_id', 'location', 'rehearsal_date', 'duration_minutes'))
+
+        to_create, skipped = [], []
+        for occurrence in occurrences:
+            end = rehearsal_end(occurrence, duration_minutes)
+            clash = next(
+                (row for row in busy if row[2] < end and occurrence < rehearsal_end(row[2], row[3])),
+                None,
+            )
+            if clash is None:
+                to_create.append(Rehearsal(
+                    band=band,
+                    rehearsal_date=occurrence,
+                    duration_minutes=duration_minutes,
+                    location=location,
+                ))
+            elif clash[1] == location:
+                skipped.append((occurrence, 'место занято'))
+            else:
+                skipped.append((occurrence, 'у группы другая репетиция'))
+
+        created = Rehearsal.objects.bulk_create(to_create)
+
+    # bulk_create не отправляет post_save, кэш свободных окон чистим сами.
+    invalidate_slots(
+        (location, rehearsal.rehearsal_date, duration_minutes) for rehearsal in created
+    )
+    if created:
+        bump_versions('rehearsals')
+    return created, skipped
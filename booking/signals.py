@@ -0,0 +1,43 @@
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import Rehearsal
+from .slots import invalidate_slots
+
+
+def rehearsal_slot(location, rehearsal_date, duration_minutes):
+    start = Rehearsal._meta.get_field('rehearsal_date').to_python(rehearsal_date)
+    if timezone.is_naive(start):
+        start = timezone.make_aware(start)
+    return location, start, int(duration_minutes)
+
+
+@receiver(pre_save, sender=Rehearsal)
+def remember_previous_slot(sender, instance, raw=False, **kwargs):
+    instance._previous_slot = None
+    if instance.pk and not raw:
+        instance._previous_slot = sender.objects.filter(pk=instance.pk).values_list(
+            'location', 'rehearsal_date', 'duration_minutes'
+        ).first()
+
+
+def invalidate_on_commit(slots, using):
+    # Сбросить кэш раньше коммита нельзя: параллельный запрос успеет
+    # закэшировать окна без этой репетиции, и они продержатся CACHE_TIMEOUT.
+    transaction.on_commit(lambda: invalidate_slots(slots), using=using)
+
+
+@receiver(post_save, sender=Rehearsal)
+def invalidate_saved_slot(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    slots = [rehearsal_slot(instance.location, instance.rehearsal_date, instance.duration_minutes)]
+    previous = getattr(instance, '_previous_slot', None)
+    if previous:
+        slots.append(rehearsal_slot(*previous))
+    invalidate_on_commit(slots, using)
+
+
+@receiver(post_delete, sender=Rehearsal)
+def invalidate_deleted_slot(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    invalidate_on_commit([rehearsal_slot(instance.location, instance.rehearsal_date, instance.duration_minutes)], using)
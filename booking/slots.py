@@ -0,0 +1,155 @@
+import hashlib
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.utils import timezone
+
+from core.dates import local_tz
+from core.expressions import RehearsalSpan
+from core.models import Rehearsal
+
+# Часы работы репетиционных точек (местное время).
+DAY_START = time(9, 0)
+DAY_END = time(23, 0)
+MAX_RANGE_DAYS = 31
+CACHE_TIMEOUT = 60 * 60
+LOCATIONS_CACHE_KEY = 'booking:locations'
+
+
+def day_bounds(day):
+    tz = local_tz()
+    return (
+        timezone.make_aware(datetime.combine(day, DAY_START), tz),
+        timezone.make_aware(datetime.combine(day, DAY_END), tz),
+    )
+
+
+def days_touched(start, end):
+    """Локальные даты, которые задевает интервал [start, end)."""
+    tz = local_tz()
+    day = timezone.localtime(start, tz).date()
+    last = timezone.localtime(end - timedelta(microseconds=1), tz).date()
+    while day <= last:
+        yield day
+        day += timedelta(days=1)
+
+
+def slots_cache_key(location, day):
+    digest = hashlib.md5(location.encode()).hexdigest()
+    return f'booking:free:{digest}:{day.isoformat()}'
+
+
+def merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def free_gaps(window_start, window_end, busy):
+    """Sweep-line по отсортированным занятым интервалам: свободные окна дня."""
+    gaps = []
+    cursor = window_start
+    for start, end in merge_intervals(busy):
+        if end <= cursor:
+            continue
+        if start >= window_end:
+            break
+        if start > cursor:
+            gaps.append((cursor, start))
+        cursor = max(cursor, end)
+    if cursor < window_end:
+        gaps.append((cursor, window_end))
+    return gaps
+
+
+def known_locations():
+    locations = cache.get(LOCATIONS_CACHE_KEY)
+    if locations is None:
+        locations = sorted(
+            Rehearsal.objects.order_by().values_list('location', flat=True).distinct()
+        )
+        cache.set(LOCATIONS_CACHE_KEY, locations, CACHE_TIMEOUT)
+    return locations
+
+
+def day_gaps(locations, days):
+    """
+    Свободные окна {(location, day): [(start, end), ...]}.
+
+    Сначала берём то, что уже лежит в кэше; для остального делаем один
+    диапазонный запрос по занятым интервалам и досчитываем.
+    """
+    keys = {slots_cache_key(location, day): (location, day) for location in locations for day in days}
+    cached = cache.get_many(keys)
+    result = {keys[key]: gaps for key, gaps in cached.items()}
+
+    missing = [pair for key, pair in keys.items() if key not in cached]
+    if not missing:
+        return result
+
+    missing_locations = sorted({location for location, _ in missing})
+    range_start = day_bounds(min(day for _, day in missing))[0]
+    range_end = day_bounds(max(day for _, day in missing))[1]
+    booked = Rehearsal.objects.annotate(
+        span=RehearsalSpan('rehearsal_date', 'duration_minutes')
+    ).filter(
+        location__in=missing_locations,
+        span__overlap=DateTimeTZRange(range_start, range_end),
+    ).values_list('location', 'rehearsal_date', 'duration_minutes')
+
+    busy = {pair: [] for pair in missing}
+    for location, start, minutes in booked:
+        end = start + timedelta(minutes=minutes)
+        for day in days_touched(start, end):
+            if (location, day) in busy:
+                busy[(location, day)].append((start, end))
+
+    to_cache = {}
+    for pair, intervals in busy.items():
+        gaps = free_gaps(*day_bounds(pair[1]), intervals)
+        result[pair] = gaps
+        to_cache[slots_cache_key(*pair)] = gaps
+    cache.set_many(to_cache, CACHE_TIMEOUT)
+    return result
+
+
+def find_free_slots(date_from, date_to, duration_minutes, location=None):
+    days = []
+    day = date_from
+    while day <= date_to:
+        days.append(day)
+        day += timedelta(days=1)
+
+    locations = [location] if location else known_locations()
+    gaps = day_gaps(locations, days)
+
+    now = timezone.now()
+    duration = timedelta(minutes=duration_minutes)
+    slots = []
+    for location in locations:
+        for day in days:
+            for start, end in gaps.get((location, day), []):
+                start = max(start, now)
+                if end - start >= duration:
+                    slots.append({'location': location, 'date': day, 'start': start, 'end': end})
+    return slots
+
+
+def invalidate_slots(slots):
+    """slots — итерируемое (location, start, duration_minutes)."""
+    keys, locations = [], set()
+    for location, start, duration_minutes in slots:
+        end = start + timedelta(minutes=duration_minutes)
+        keys.extend(slots_cache_key(location, day) for day in days_touched(start, end))
+        locations.add(location)
+    cache.delete_many(keys)
+
+    known = cache.get(LOCATIONS_CACHE_KEY)
+    if known is not None and not locations.issubset(known):
+        cache.delete(LOCATIONS_CACHE_KEY)
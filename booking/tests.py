@@ -1,6 +1,13 @@
+from datetime import datetime, time
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.urls import reverse
 from core.models import Band, Rehearsal
+from booking.forms import RehearsalsForm
+from core.conflicts import overlapping_rehearsals, reserve_rehearsal
+from core.ical import format_datetime
+from core.schema import find_drift, get_manifest, load_manifest
 from django.utils import timezone
 
 class BookingViewTests(TestCase):
@@ -26,4 +33,217 @@ class BookingViewTests(TestCase):
         }
         response = self.client.post(self.url, data)
         self.assertEqual(response.status_code, 302)
-        self.assertTrue(Rehearsal.objects.filter(location='Main Studio').exists())
\ No newline at end of file
+        self.assertTrue(Rehearsal.objects.filter(location='Main Studio').exists())
+
+    def test_book_page_skips_catalog_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url)
+        self.assertFalse(any('information_schema' in q['sql'] for q in ctx.captured_queries))
+
+    def test_overlapping_rehearsal_rejected(self):
+        start = timezone.now() + timezone.timedelta(days=3)
+        Rehearsal.objects.create(band=self.band, rehearsal_date=start, duration_minutes=90, location='Main Studio')
+        other_band = Band.objects.create(band_name="Other Band", genre="jazz")
+        data = {
+            'band': other_band.band_id,
+            'rehearsal_date': timezone.localtime(start + timezone.timedelta(minutes=30)).strftime('%Y-%m-%dT%H:%M'),
+            'duration_minutes': 60,
+            'location': 'Main Studio'
+        }
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Это место уже забронировано на выбранное время.')
+        self.assertEqual(Rehearsal.objects.count(), 1)
+
+    def test_overlapping_rehearsals_query(self):
+        start = timezone.now() + timezone.timedelta(days=3)
+        rehearsal = Rehearsal.objects.create(band=self.band, rehearsal_date=start, duration_minutes=60, location='Studio A')
+        self.assertEqual(list(overlapping_rehearsals(start + timezone.timedelta(minutes=59), 30, location='Studio A')), [rehearsal])
+        self.assertFalse(overlapping_rehearsals(start + timezone.timedelta(minutes=60), 30, location='Studio A').exists())
+        self.assertFalse(overlapping_rehearsals(start, 30, band=self.band, exclude_pk=rehearsal.pk).exists())
+
+    def test_rehearsal_list_keyset_pages(self):
+        start = timezone.now() + timezone.timedelta(days=1)
+        Rehearsal.objects.create(band=self.band, rehearsal_date=start - timezone.timedelta(days=2), duration_minutes=60, location='Past Studio')
+        for i in range(25):
+            Rehearsal.objects.create(band=self.band, rehearsal_date=start + timezone.timedelta(hours=i), duration_minutes=60, location=f'Studio {i}')
+
+        first = self.client.get(self.url)
+        page = first.context['rehearsals']
+        self.assertEqual(len(page), 20)
+        self.assertFalse(page.has_previous())
+        self.assertEqual(first.context['total'], 25)
+        self.assertNotContains(first, 'Past Studio')
+
+        second = self.client.get(self.url, {'cursor': page.next_cursor})
+        tail = second.context['rehearsals']
+        self.assertEqual([r.location for r in tail], [f'Studio {i}' for i in range(20, 25)])
+        self.assertFalse(tail.has_next())
+
+        back = self.client.get(self.url, {'cursor': tail.previous_cursor})
+        self.assertEqual([r.pk for r in back.context['rehearsals']], [r.pk for r in page])
+
+        everything = self.client.get(self.url, {'period': 'all'})
+        self.assertContains(everything, 'Past Studio')
+
+    def test_weekly_series_skips_taken_dates(self):
+        start = timezone.localtime().replace(hour=18, minute=0, second=0, microsecond=0) + timezone.timedelta(days=7)
+        taken = start + timezone.timedelta(weeks=2)
+        other_band = Band.objects.create(band_name="Other Band", genre="jazz")
+        Rehearsal.objects.create(band=other_band, rehearsal_date=taken, duration_minutes=60, location='Main Studio')
+
+        data = {
+            'band': self.band.band_id,
+            'rehearsal_date': start.strftime('%Y-%m-%dT%H:%M'),
+            'duration_minutes': 90,
+            'location': 'Main Studio',
+            'recurrence': 'weekly',
+            'repeat_until': (start + timezone.timedelta(weeks=4)).date().isoformat(),
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 302)
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "rehearsals"')]
+        self.assertEqual(len(inserts), 1)
+
+        series = Rehearsal.objects.filter(band=self.band).order_by('rehearsal_date')
+        self.assertEqual(
+            [r.rehearsal_date for r in series],
+            [start + timezone.timedelta(weeks=w) for w in (0, 1, 3, 4)]
+        )
+
+    def test_series_requires_end_date(self):
+        data = {
+            'band': self.band.band_id,
+            'rehearsal_date': '2030-01-01T18:00',
+            'duration_minutes': 60,
+            'location': 'Main Studio',
+            'recurrence': 'weekly',
+        }
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Rehearsal.objects.exists())
+
+    def test_replayed_submission_creates_one_rehearsal(self):
+        data = {
+            'band': self.band.band_id,
+            'rehearsal_date': '2030-05-01T14:00',
+            'duration_minutes': 60,
+            'location': 'Main Studio',
+            'idempotency_key': 'c0ffee',
+        }
+        first = self.client.post(self.url, data)
+        second = self.client.post(self.url, data)
+        self.assertEqual(first.status_code, 302)
+        self.assertEqual(second.status_code, 302)
+        self.assertEqual(second['Location'], first['Location'])
+        self.assertEqual(Rehearsal.objects.count(), 1)
+
+    def test_reserve_rechecks_slot_after_validation(self):
+        form = RehearsalsForm({
+            'band': self.band.band_id,
+            'rehearsal_date': '2030-05-01T14:00',
+            'duration_minutes': 60,
+            'location': 'Main Studio',
+        })
+        self.assertTrue(form.is_valid())
+        rival = Band.objects.create(band_name="Rival", genre="pop")
+        Rehearsal.objects.create(band=rival, rehearsal_date=form.cleaned_data['rehearsal_date'], duration_minutes=30, location='Main Studio')
+
+        self.assertIsNone(reserve_rehearsal(form))
+        self.assertIn('Это место уже забронировано на выбранное время.', form.non_field_errors())
+        self.assertEqual(Rehearsal.objects.count(), 1)
+
+
+class FreeSlotsTests(TestCase):
+    def setUp(self):
+        self.band = Band.objects.create(band_name="Slot Band", genre="rock")
+        self.day = timezone.localdate() + timezone.timedelta(days=2)
+        self.url = reverse('free_slots')
+
+    def at(self, hour):
+        return timezone.make_aware(datetime.combine(self.day, time(hour)))
+
+    def get_slots(self, **params):
+        params = {'date_from': self.day.isoformat(), 'duration': 60, 'location': 'Studio A', **params}
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [(s['start'][11:16], s['end'][11:16]) for s in response.json()['slots']]
+
+    def test_gaps_around_bookings(self):
+        Rehearsal.objects.create(band=self.band, rehearsal_date=self.at(10), duration_minutes=120, location='Studio A')
+        Rehearsal.objects.create(band=self.band, rehearsal_date=self.at(13), duration_minutes=30, location='Studio A')
+        self.assertEqual(self.get_slots(), [('09:00', '10:00'), ('12:00', '13:00'), ('13:30', '23:00')])
+        self.assertEqual(self.get_slots(duration=90), [('13:30', '23:00')])
+
+    def test_cache_invalidated_on_save_and_delete(self):
+        self.assertEqual(self.get_slots(), [('09:00', '23:00')])
+        with self.captureOnCommitCallbacks() as callbacks:
+            rehearsal = Rehearsal.objects.create(band=self.band, rehearsal_date=self.at(9), duration_minutes=600, location='Studio A')
+        # До коммита кэш не сбрасывается.
+        self.assertEqual(self.get_slots(), [('09:00', '23:00')])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.get_slots(), [('19:00', '23:00')])
+        rehearsal.location = 'Studio B'
+        with self.captureOnCommitCallbacks(execute=True):
+            rehearsal.save()
+        self.assertEqual(self.get_slots(), [('09:00', '23:00')])
+        self.assertEqual(self.get_slots(location='Studio B'), [('19:00', '23:00')])
+        with self.captureOnCommitCallbacks(execute=True):
+            rehearsal.delete()
+        self.assertEqual(self.get_slots(location='Studio B'), [('09:00', '23:00')])
+
+    def test_invalid_params(self):
+        response = self.client.get(self.url, {'date_from': self.day.isoformat(), 'duration': 5})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('duration', response.json()['errors'])
+
+
+class SchemaManifestTests(TestCase):
+    def test_manifest_matches_models(self):
+        manifest = load_manifest()
+        self.assertIs(get_manifest(), manifest)
+        self.assertIn('rehearsal_date', manifest['rehearsals'])
+        self.assertEqual(find_drift(manifest), [])
+
+
+class RehearsalsFeedTests(TestCase):
+    def setUp(self):
+        self.band = Band.objects.create(band_name="Feed Band", genre="rock")
+        self.start = timezone.now().replace(microsecond=0) + timezone.timedelta(days=3)
+        Rehearsal.objects.create(band=self.band, rehearsal_date=self.start, duration_minutes=90, location='Studio; A')
+
+    def test_feed_is_valid_calendar(self):
+        response = self.client.get(reverse('band_rehearsals_ical', args=[self.band.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertIn('SUMMARY:Репетиция: Feed Band\r\n', body)
+        self.assertIn('LOCATION:Studio\\; A\r\n', body)
+        end = self.start + timezone.timedelta(minutes=90)
+        self.assertIn(f'DTEND:{format_datetime(end)}\r\n', body)
+
+    def test_conditional_get_until_rehearsals_change(self):
+        url = reverse('rehearsals_ical')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Rehearsal.objects.create(band=self.band, rehearsal_date=self.start + timezone.timedelta(days=1), duration_minutes=60, location='Studio B')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Studio B', b''.join(response.streaming_content).decode())
+
+
+class BookingConditionalGetTests(TestCase):
+    def test_list_revalidates_until_a_rehearsal_is_booked(self):
+        band = Band.objects.create(band_name="Etag Band", genre="rock")
+        url = reverse('book')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Rehearsal.objects.create(band=band, rehearsal_date=timezone.now() + timezone.timedelta(days=1), duration_minutes=60, location='Studio')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
@@ -3,4 +3,7 @@ from . import views
 
 urlpatterns = [
     path('', views.book, name='book'),
+    path('free-slots/', views.free_slots, name='free_slots'),
+    path('rehearsals.ics', views.rehearsals_ical, name='rehearsals_ical'),
+    path('bands/<int:band_id>/rehearsals.ics', views.rehearsals_ical, name='band_rehearsals_ical'),
 ]
\ No newline at end of file
@@ -1,28 +1,66 @@
-from django.shortcuts import render, redirect
+from datetime import timedelta
+
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.db import connection
+from django.http import JsonResponse
+from django.views.decorators.http import condition, require_GET
+from django.utils import timezone
+from core.conflicts import reserve_rehearsal
+from core.conditional import condition_on_versions
+from core.ical import calendar_response, feed_window_start
+from core.idempotency import idempotent
 from core.models import Rehearsal, Band
-from .forms import RehearsalsForm
+from core.pagination import KeysetPaginator, estimate_count
+from core.versioning import versions_etag, versions_last_modified
+from .forms import RehearsalsForm, FreeSlotsForm
+from .series import create_series
+from .slots import find_free_slots
+
+REHEARSALS_PER_PAGE = 20
+FEED_PAST_DAYS = 30
+FEED_TABLES = ('rehearsals', 'bands')
+
+
+def book_series(request, form):
+    data = form.cleaned_data
+    created, skipped = create_series(
+        data['band'], data['rehearsal_date'], data['duration_minutes'], data['location'],
+        data['recurrence'], data['repeat_until'],
+    )
+    messages.success(request, f"Забронировано репетиций: {len(created)}")
+    if skipped:
+        dates = ", ".join(
+            f"{timezone.localtime(start):%d.%m.%Y} ({reason})" for start, reason in skipped
+        )
+        messages.warning(request, f"Пропущено: {dates}")
+
 
+def listed_rehearsals(request):
+    """Репетиции для списка на странице: предстоящие или все (?period=all)."""
+    show_all = request.GET.get('period') == 'all'
+    rehearsals = Rehearsal.objects.all()
+    if not show_all:
+        rehearsals = rehearsals.filter(rehearsal_date__gte=timezone.now())
+    return rehearsals, show_all
 
+
+@condition_on_versions('rehearsals', 'bands')
+@idempotent
 def book(request):
     error = ""
 
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT column_name FROM information_schema.columns WHERE table_name = 'rehearsals'")
-            columns = [row[0] for row in cursor.fetchall()]
-            print("Columns in rehearsals table:", columns)
-    except Exception as e:
-        print(f"Error checking table structure: {e}")
-    
     if request.method == "POST":
         form = RehearsalsForm(request.POST)
         if form.is_valid():
             try:
-                new_rehearsal = form.save()
-                messages.success(request, "Репетиция успешно забронирована!")
-                return redirect('book')
+                if form.cleaned_data.get('recurrence'):
+                    book_series(request, form)
+                    return redirect('book')
+                if reserve_rehearsal(form) is not None:
+                    messages.success(request, "Репетиция успешно забронирована!")
+                    return redirect('book')
+                error = "Выбранное время уже занято"
+                messages.error(request, error)
             except Exception as e:
                 error = f"Ошибка сохранения: {str(e)}"
                 messages.error(request, error)
@@ -32,17 +70,86 @@ def book(request):
     else:
         form = RehearsalsForm()
 
+    rehearsals, show_all = listed_rehearsals(request)
+    rehearsals = rehearsals.select_related('band')
+
     try:
-        rehearsals = Rehearsal.objects.select_related('band').all()
+        paginator = KeysetPaginator(rehearsals, ('rehearsal_date', 'rehearsal_id'), REHEARSALS_PER_PAGE)
+        page = paginator.get_page(request.GET.get('cursor'))
+        total, total_is_estimate = estimate_count(rehearsals)
     except Exception as e:
-        rehearsals = []
+        page, total, total_is_estimate = [], 0, False
         error = f"Ошибка загрузки данных: {str(e)}"
         messages.error(request, error)
 
     data = {
         "form": form,
         "error": error,
-        "rehearsals": rehearsals
+        "rehearsals": page,
+        "total": total,
+        "total_is_estimate": total_is_estimate,
+        "show_all": show_all,
     }
 
-    return render(request, "booking/bookPage.html", data)
\ No newline at end of file
+    return render(request, "booking/bookPage.html", data)
+
+
+@require_GET
+def free_slots(request):
+    form = FreeSlotsForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    params = form.cleaned_data
+    slots = find_free_slots(
+        params['date_from'], params['date_to'], params['duration'],
+        location=params['location'] or None,
+    )
+    return JsonResponse({
+        'duration': params['duration'],
+        'slots': [
+            {
+                'location': slot['location'],
+                'date': slot['date'].isoformat(),
+                'start': timezone.localtime(slot['start']).isoformat(),
+                'end': timezone.localtime(slot['end']).isoformat(),
+            }
+            for slot in slots
+        ],
+    })
+
+
+def rehearsals_feed_etag(request, band_id=None):
+    since = feed_window_start(FEED_PAST_DAYS)
+    return versions_etag('rehearsals-ics', *FEED_TABLES, extra=f"{band_id or 'all'}-{since:%Y%m%d}")
+
+
+def rehearsals_feed_last_modified(request, band_id=None):
+    return max(versions_last_modified(*FEED_TABLES), feed_window_start(FEED_PAST_DAYS))
+
+
+@require_GET
+@condition(etag_func=rehearsals_feed_etag, last_modified_func=rehearsals_feed_last_modified)
+def rehearsals_ical(request, band_id=None):
+    rehearsals = Rehearsal.objects.select_related('band').filter(
+        rehearsal_date__gte=feed_window_start(FEED_PAST_DAYS)
+    ).order_by('rehearsal_date', 'rehearsal_id')
+    name = "Репетиции Encore"
+    filename = "rehearsals.ics"
+    if band_id is not None:
+        band = get_object_or_404(Band, pk=band_id)
+        rehearsals = rehearsals.filter(band=band)
+        name = f"Репетиции: {band.band_name}"
+        filename = f"rehearsals-{band.pk}.ics"
+
+    events = (
+        {
+            'uid': f'rehearsal-{rehearsal.pk}@encore',
+            'start': rehearsal.rehearsal_date,
+            'end': rehearsal.rehearsal_date + timedelta(minutes=rehearsal.duration_minutes),
+            'summary': f"Репетиция: {rehearsal.band.band_name}",
+            'location': rehearsal.location,
+        }
+        for rehearsal in rehearsals.iterator(chunk_size=500)
+    )
+    return calendar_response(name, events, rehearsals_feed_last_modified(request), filename)
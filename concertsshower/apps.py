@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class ConcertsshowerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'concertsshower'
\ No newline at end of file
+    name = 'concertsshower'
+
+    def ready(self):
+        from . import signals  # noqa: F401
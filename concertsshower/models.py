@@ -1,5 +1,8 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
+from core.search import concert_search_vector
+
 class Band(models.Model):
     band_id = models.AutoField(primary_key=True, db_column='band_id')
     band_name = models.CharField("Название группы", max_length=100)
@@ -18,6 +21,11 @@ class Concert(models.Model):
     concert_title = models.CharField("Название", max_length=200)
     venue_address = models.CharField("Адрес", max_length=255)
     concert_date = models.DateTimeField("Дата и время")
+    search_vector = models.GeneratedField(
+        expression=concert_search_vector(),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         db_table = "concerts"
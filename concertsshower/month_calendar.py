@@ -0,0 +1,86 @@
+import calendar
+from datetime import date
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncDay
+from django.utils import timezone
+
+from core.dates import day_range, local_tz
+from core.versioning import bump_versions, versions_stamp
+from .models import Concert
+
+CALENDAR_CACHE_TIMEOUT = 60 * 60 * 24
+WEEKDAYS = ('Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс')
+
+
+def month_version_name(year, month):
+    return f'concerts-month:{year:04d}-{month:02d}'
+
+
+def month_of(concert_date):
+    # Значение могло прийти строкой или без зоны — как его сохранит поле.
+    concert_date = Concert._meta.get_field('concert_date').to_python(concert_date)
+    if timezone.is_naive(concert_date):
+        concert_date = timezone.make_aware(concert_date)
+    local = timezone.localtime(concert_date, local_tz())
+    return local.year, local.month
+
+
+def invalidate_months(concert_dates):
+    """Поднять версии месяцев, в которые попадают даты концертов."""
+    names = {month_version_name(*month_of(value)) for value in concert_dates if value}
+    if names:
+        bump_versions(*names)
+
+
+def month_days(year, month):
+    """
+    Концерты месяца по дням одним запросом:
+    GROUP BY date_trunc('day', concert_date AT TIME ZONE 'Europe/Minsk').
+
+    Возвращает {date: {'count': n, 'concerts': [(id, title), ...]}}.
+    """
+    last_day = calendar.monthrange(year, month)[1]
+    start, end = day_range(date(year, month, 1), date(year, month, last_day))
+    ordering = ('concert_date', 'concert_id')
+    rows = (
+        Concert.objects.filter(concert_date__gte=start, concert_date__lt=end)
+        .annotate(day=TruncDay('concert_date', tzinfo=local_tz()))
+        .values('day')
+        .annotate(
+            count=Count('concert_id'),
+            ids=ArrayAgg('concert_id', ordering=ordering),
+            titles=ArrayAgg('concert_title', ordering=ordering),
+        )
+        .order_by('day')
+    )
+    return {
+        row['day'].date(): {'count': row['count'], 'concerts': list(zip(row['ids'], row['titles']))}
+        for row in rows
+    }
+
+
+def cached_month_days(year, month):
+    """
+    month_days из кэша. Версия месяца меняется только при изменении концерта
+    этого месяца, поэтому правки в других месяцах кэш не сбрасывают.
+    """
+    key = f'calendar:{year:04d}-{month:02d}:{versions_stamp(month_version_name(year, month))}'
+    days = cache.get(key)
+    if days is None:
+        days = month_days(year, month)
+        cache.set(key, days, CALENDAR_CACHE_TIMEOUT)
+    return days
+
+
+def month_weeks(year, month, days):
+    """Сетка месяца по неделям (с понедельника) для шаблона."""
+    return [
+        [
+            {'date': day, 'in_month': day.month == month, 'info': days.get(day)}
+            for day in week
+        ]
+        for week in calendar.Calendar(firstweekday=0).monthdatescalendar(year, month)
+    ]
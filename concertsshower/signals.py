@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from core.lineups import watch
+from core.models import Concert as CoreConcert
+from core.signals import track
+
+from .models import Band, Concert, Performance
+from .month_calendar import invalidate_months
+
+# Неуправляемые копии пишут в те же таблицы, что и модели core.
+track(Band, 'bands')
+track(Concert, 'concerts')
+track(Performance, 'performances')
+watch(Band, fields=('band_name',))
+watch(Concert)
+watch(Performance)
+
+
+def remember_previous_date(sender, instance, raw=False, **kwargs):
+    instance._previous_concert_date = None
+    if instance.pk and not raw:
+        instance._previous_concert_date = sender.objects.filter(pk=instance.pk).values_list(
+            'concert_date', flat=True
+        ).first()
+
+
+def invalidate_saved_month(sender, instance, **kwargs):
+    invalidate_months([instance.concert_date, getattr(instance, '_previous_concert_date', None)])
+
+
+def invalidate_deleted_month(sender, instance, **kwargs):
+    invalidate_months([instance.concert_date])
+
+
+# Календарь сбрасывается помесячно — для обеих моделей таблицы concerts.
+for model in (CoreConcert, Concert):
+    label = model._meta.label
+    pre_save.connect(remember_previous_date, sender=model, dispatch_uid=f'calendar-pre-save-{label}')
+    post_save.connect(invalidate_saved_month, sender=model, dispatch_uid=f'calendar-save-{label}')
+    post_delete.connect(invalidate_deleted_month, sender=model, dispatch_uid=f'calendar-delete-{label}')
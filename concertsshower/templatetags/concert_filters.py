@@ -2,11 +2,17 @@ from django import template
 
 register = template.Library()
 
+# Номер страницы и курсор взаимоисключающие: задав одно, сбрасываем другое.
+PAGINATION_PARAMS = ('page', 'cursor')
+
 @register.simple_tag(takes_context=True)
 def url_replace(context, **kwargs):
     query = context['request'].GET.copy()
     
     for key, value in kwargs.items():
+        if key in PAGINATION_PARAMS:
+            for param in PAGINATION_PARAMS:
+                query.pop(param, None)
         if value:
             query[key] = str(value)
         elif key in query:
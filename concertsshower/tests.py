@@ -1,15 +1,29 @@
-from django.test import TestCase
+from datetime import date, datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from core.models import Concert
+from core import lineups
+from core.conditional import TIME_BUCKET
+from core.lineups import queue_refresh
+from core.models import Band, Concert, Performance, UpcomingLineup
+from concertsshower.models import Band as MirrorBand, Concert as MirrorConcert
+from concertsshower.month_calendar import month_days
+from core.dates import local_tz
 from django.utils import timezone
 
+@override_settings(LINEUPS_REFRESH_ASYNC=False)
 class ConcertViewTests(TestCase):
     def setUp(self):
-        self.concert = Concert.objects.create(
-            concert_title="Mega Rock Fest",
-            venue_address="Minsk, Arena",
-            concert_date=timezone.now() + timezone.timedelta(days=1)
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.concert = Concert.objects.create(
+                concert_title="Mega Rock Fest",
+                venue_address="Minsk, Arena",
+                concert_date=timezone.now() + timezone.timedelta(days=1)
+            )
 
     def test_upcoming_concerts_view(self):
         url = reverse('concertsshower:upcoming_concerts')
@@ -21,4 +35,316 @@ class ConcertViewTests(TestCase):
         url = reverse('concertsshower:concert_detail', args=[self.concert.concert_id])
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, "Minsk, Arena")
\ No newline at end of file
+        self.assertContains(response, "Minsk, Arena")
+
+    def test_concerts_feed_conditional_get(self):
+        url = reverse('concertsshower:concerts_ical')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('SUMMARY:Mega Rock Fest', b''.join(response.streaming_content).decode())
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_concerts_feed_etag_changes_with_window_day(self):
+        url = reverse('concertsshower:concerts_ical')
+        etag = self.client.get(url)['ETag']
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timezone.timedelta(days=1)):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ConcertSearchTests(TestCase):
+    def setUp(self):
+        date = timezone.now() - timezone.timedelta(days=30)
+        Concert.objects.create(concert_title="Весенние концерты", venue_address="Минск, Дворец спорта", concert_date=date)
+        Concert.objects.create(concert_title="Jazz Evening", venue_address="Grodno, Philharmonic", concert_date=date)
+        Concert.objects.create(concert_title="Осенний вечер", venue_address="Концертный зал, Гомель", concert_date=date)
+
+    def search(self, text):
+        response = self.client.get(reverse('concertsshower:all_concerts'), {'search': text})
+        self.assertEqual(response.status_code, 200)
+        return [concert.concert_title for concert in response.context['concerts']]
+
+    def test_word_forms_match_and_title_outranks_venue(self):
+        self.assertEqual(self.search("концерт"), ["Весенние концерты", "Осенний вечер"])
+
+    def test_query_without_words_keeps_full_archive(self):
+        self.assertEqual(len(self.search("!!")), 3)
+
+    def test_prefix_fallback_while_typing(self):
+        self.assertEqual(self.search("philh"), ["Jazz Evening"])
+        self.assertEqual(self.search("jazz eve"), ["Jazz Evening"])
+
+    def test_search_uses_vector_not_ilike(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.search("Минск")
+        sql = " ".join(query['sql'] for query in ctx.captured_queries)
+        self.assertIn('"search_vector" @@', sql)
+        self.assertNotIn('LIKE', sql.upper())
+
+
+class ConcertArchivePaginationTests(TestCase):
+    def setUp(self):
+        start = timezone.now() - timezone.timedelta(days=100)
+        for i in range(20):
+            Concert.objects.create(
+                concert_title=f"Рок концерт {i}",
+                venue_address="Минск",
+                concert_date=start + timezone.timedelta(days=i),
+            )
+        self.url = reverse('concertsshower:all_concerts')
+
+    def walk(self, params):
+        titles, cursor = [], None
+        while True:
+            response = self.client.get(self.url, dict(params, **({'cursor': cursor} if cursor else {})))
+            page = response.context['concerts']
+            titles += [concert.concert_title for concert in page]
+            if not page.has_next():
+                return titles, response
+            cursor = page.next_cursor
+
+    def test_cursor_walk_covers_archive_newest_first(self):
+        titles, response = self.walk({})
+        self.assertEqual(titles, [f"Рок концерт {i}" for i in range(19, -1, -1)])
+        self.assertEqual(response.context['total'], 20)
+        self.assertFalse(response.context['total_is_estimate'])
+
+    def test_cursor_walk_over_ranked_search(self):
+        Concert.objects.create(concert_title="Концерт", venue_address="Брест", concert_date=timezone.now())
+        titles, response = self.walk({'search': 'концерт'})
+        self.assertEqual(len(titles), 21)
+        self.assertEqual(len(set(titles)), 21)
+
+    def test_previous_cursor_returns_first_page(self):
+        first = self.client.get(self.url).context['concerts']
+        second = self.client.get(self.url, {'cursor': first.next_cursor}).context['concerts']
+        back = self.client.get(self.url, {'cursor': second.previous_cursor}).context['concerts']
+        self.assertEqual(list(back), list(first))
+
+    def test_url_replace_swaps_page_for_cursor(self):
+        response = self.client.get(self.url, {'search': 'рок', 'page': 3})
+        html = response.content.decode()
+        self.assertIn('search=%D1%80%D0%BE%D0%BA&amp;cursor=', html)
+        self.assertNotIn('page=3', html)
+
+
+@override_settings(LINEUPS_REFRESH_ASYNC=False)
+class PublicPageCacheTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.concert = Concert.objects.create(
+                concert_title="Cached Fest",
+                venue_address="Minsk",
+                concert_date=timezone.now() + timezone.timedelta(days=2),
+            )
+        self.url = reverse('concertsshower:upcoming_concerts')
+
+    def concert_queries(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        return response, [q['sql'] for q in ctx.captured_queries if '"upcoming_lineups"' in q['sql']]
+
+    def test_repeat_anonymous_request_is_served_from_cache(self):
+        response, queries = self.concert_queries()
+        self.assertContains(response, "Cached Fest")
+        self.assertEqual(queries, [])
+
+    def test_saving_concert_invalidates_page(self):
+        self.client.get(self.url)
+        self.concert.concert_title = "Renamed Fest"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.concert.save()
+        self.assertContains(self.client.get(self.url), "Renamed Fest")
+
+    def test_mirror_model_save_invalidates_page(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            MirrorConcert.objects.create(
+                concert_title="Mirror Fest",
+                venue_address="Minsk",
+                concert_date=timezone.now() + timezone.timedelta(days=3),
+            )
+        self.assertContains(self.client.get(self.url), "Mirror Fest")
+
+    def test_authenticated_user_bypasses_page_cache(self):
+        User = get_user_model()
+        User.objects.create_user(username='fan', password='password')
+        self.client.login(username='fan', password='password')
+        response, queries = self.concert_queries()
+        self.assertNotEqual(queries, [])
+
+
+@override_settings(LINEUPS_REFRESH_ASYNC=False)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.concert = Concert.objects.create(
+            concert_title="Etag Fest", venue_address="Minsk",
+            concert_date=timezone.now() + timezone.timedelta(days=5),
+        )
+        band = Band.objects.create(band_name="Opening Act", genre="rock")
+        self.performance = Performance.objects.create(band=band, concert=self.concert, performance_order=1)
+        self.url = reverse('concertsshower:concert_detail', args=[self.concert.pk])
+
+    def test_unchanged_detail_returns_304_without_rendering(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_expires_with_time_bucket(self):
+        # «Через 5 дней» устаревает со временем, даже если данные не менялись.
+        etag = self.client.get(self.url)['ETag']
+        later = datetime.now(tz=dt_timezone.utc) + timezone.timedelta(seconds=TIME_BUCKET)
+        with mock.patch('core.conditional.datetime') as clock:
+            clock.now.return_value = later
+            clock.fromtimestamp.side_effect = datetime.fromtimestamp
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_removed_performance_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.performance.delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "Opening Act")
+
+    def test_archive_last_modified(self):
+        response = self.client.get(reverse('concertsshower:all_concerts'))
+        response = self.client.get(
+            reverse('concertsshower:all_concerts'), HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+
+@override_settings(LINEUPS_REFRESH_ASYNC=False)
+class UpcomingLineupTests(TestCase):
+    def setUp(self):
+        self.url = reverse('concertsshower:upcoming_concerts')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.concert = Concert.objects.create(
+                concert_title="Lineup Fest", venue_address="Minsk",
+                concert_date=timezone.now() + timezone.timedelta(days=4),
+            )
+            for order, name in ((2, "Headliner"), (1, "Opener")):
+                band = Band.objects.create(band_name=name, genre="rock")
+                Performance.objects.create(band=band, concert=self.concert, performance_order=order)
+
+    def test_one_refresh_per_transaction(self):
+        with CaptureQueriesContext(connection) as ctx:
+            with self.captureOnCommitCallbacks(execute=True):
+                Band.objects.create(band_name="Another", genre="pop")
+                self.concert.save()
+        refreshes = [q for q in ctx.captured_queries if q['sql'].startswith('REFRESH MATERIALIZED VIEW')]
+        self.assertEqual(len(refreshes), 1)
+
+    def test_upcoming_list_with_lineups_is_one_read(self):
+        with self.assertNumQueries(1):
+            concerts = list(UpcomingLineup.objects.filter(concert_date__gte=timezone.now()))
+        self.assertEqual([act['band_name'] for act in concerts[0].lineup], ["Opener", "Headliner"])
+
+        response = self.client.get(self.url)
+        html = response.content.decode()
+        self.assertLess(html.index("Opener"), html.index("Headliner"))
+
+    def test_lineup_follows_band_rename(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            band = Band.objects.get(band_name="Opener")
+            band.band_name = "Support"
+            band.save()
+        self.assertContains(self.client.get(self.url), "Support")
+
+    def test_band_edit_outside_lineup_fields_skips_refresh(self):
+        band = Band.objects.get(band_name="Opener")
+        band.genre = "jazz"
+        with CaptureQueriesContext(connection) as ctx:
+            with self.captureOnCommitCallbacks(execute=True):
+                band.save()
+        self.assertFalse([q for q in ctx.captured_queries if q['sql'].startswith('REFRESH')])
+
+    def test_refresh_error_is_logged_not_raised(self):
+        with mock.patch('core.lineups.refresh_upcoming_lineups', side_effect=DatabaseError('boom')):
+            with self.assertLogs('core.lineups', level='ERROR'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.concert.save()
+
+    def test_background_refreshes_are_coalesced(self):
+        self.addCleanup(lineups._queued.discard, 'default')
+        with mock.patch('core.lineups._executor') as executor:
+            queue_refresh('default')
+            queue_refresh('default')
+        self.assertEqual(executor.submit.call_count, 1)
+
+
+class MirrorModelTests(TestCase):
+    def test_band_created_through_mirror_gets_database_defaults(self):
+        mirror = MirrorBand.objects.create(band_name="Mirror Band", genre="rock", founded_date=timezone.now())
+        band = Band.objects.get(pk=mirror.pk)
+        self.assertEqual(band.member_count, 0)
+        self.assertEqual(band.logo_thumbnails, {})
+
+
+class ConcertCalendarTests(TestCase):
+    def setUp(self):
+        tz = local_tz()
+        self.march_url = reverse('concertsshower:concert_calendar_month', args=[2030, 3])
+        self.late = Concert.objects.create(
+            concert_title="Late Show",
+            venue_address="Minsk",
+            concert_date=datetime(2030, 3, 31, 23, 30, tzinfo=tz),
+        )
+        Concert.objects.create(
+            concert_title="Early Show",
+            venue_address="Minsk",
+            concert_date=datetime(2030, 3, 31, 19, 0, tzinfo=tz),
+        )
+        self.april = Concert.objects.create(
+            concert_title="April Show",
+            venue_address="Minsk",
+            concert_date=datetime(2030, 4, 1, 0, 30, tzinfo=tz),
+        )
+
+    def calendar_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.march_url)
+        return response, [q['sql'] for q in ctx.captured_queries if '"concerts"' in q['sql']]
+
+    def test_month_is_grouped_by_local_day_in_one_query(self):
+        response, queries = self.calendar_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertIn('GROUP BY', queries[0])
+        day = month_days(2030, 3)[date(2030, 3, 31)]
+        self.assertEqual(day['count'], 2)
+        self.assertEqual([title for _, title in day['concerts']], ["Early Show", "Late Show"])
+        self.assertContains(response, "Late Show")
+        self.assertNotContains(response, "April Show")
+
+    def test_repeat_request_is_served_from_cache(self):
+        self.client.get(self.march_url)
+        response, queries = self.calendar_queries()
+        self.assertEqual(queries, [])
+        self.assertContains(response, "Early Show")
+
+    def test_change_in_other_month_keeps_cache(self):
+        self.client.get(self.march_url)
+        self.april.concert_title = "Renamed April"
+        self.april.save()
+        _, queries = self.calendar_queries()
+        self.assertEqual(queries, [])
+
+    def test_change_in_month_invalidates_cache(self):
+        self.client.get(self.march_url)
+        self.late.concert_title = "Renamed Late"
+        self.late.save()
+        self.assertContains(self.client.get(self.march_url), "Renamed Late")
+
+    def test_moving_concert_out_of_month_invalidates_old_month(self):
+        self.client.get(self.march_url)
+        self.late.concert_date += timezone.timedelta(days=5)
+        self.late.save()
+        self.assertNotContains(self.client.get(self.march_url), "Late Show")
+
+    def test_invalid_month_returns_404(self):
+        for year, month in ((2030, 13), (2030, 0), (0, 5)):
+            url = reverse('concertsshower:concert_calendar_month', args=[year, month])
+            self.assertEqual(self.client.get(url).status_code, 404)
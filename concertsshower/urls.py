@@ -7,6 +7,10 @@ urlpatterns = [
     path('', views.all_concerts, name='all_concerts'),
     
     path('upcoming/', views.upcoming_concerts, name='upcoming_concerts'),
+    path('calendar/', views.concert_calendar, name='concert_calendar'),
+    path('calendar/<int:year>/<int:month>/', views.concert_calendar, name='concert_calendar_month'),
+    path('upcoming.ics', views.concerts_ical, name='concerts_ical'),
+    path('bands/<int:band_id>.ics', views.concerts_ical, name='band_concerts_ical'),
     
     path('<int:pk>/', views.concert_detail, name='concert_detail'),
 ]
\ No newline at end of file
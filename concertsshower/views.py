@@ -1,15 +1,33 @@
+from datetime import date
+
+from django.http import Http404
 from django.shortcuts import render, get_object_or_404
 from django.utils import timezone
-from django.core.paginator import Paginator
-from django.db.models import Q
-from .models import Concert, Performance
+from django.views.decorators.http import condition, require_GET
+from core.conditional import condition_on_versions
+from core.dates import filter_day_range
+from core.ical import calendar_response, feed_window_start
+from core.models import UpcomingLineup
+from core.pagecache import cache_public_page
+from core.pagination import KeysetPaginator, estimate_count
+from core.search import search_concerts
+from core.versioning import versions_etag, versions_last_modified, versions_stamp
+from .models import Band, Concert, Performance
+from .month_calendar import WEEKDAYS, cached_month_days, month_weeks
+
+ARCHIVE_PER_PAGE = 9
+ARCHIVE_ORDERING = ('-concert_date', '-concert_id')
+FEED_PAST_DAYS = 30
+CONCERT_TABLES = ('concerts', 'performances', 'bands')
 
+@cache_public_page('upcoming_lineups')
 def upcoming_concerts(request):
     now = timezone.now()
     
-    concerts = Concert.objects.filter(
+    # Концерты вместе с составами — одно чтение из upcoming_lineups.
+    concerts = UpcomingLineup.objects.filter(
         concert_date__gte=now
-    ).order_by('concert_date')
+    ).order_by('concert_date', 'concert_id')
     
     context = {
         'concerts': concerts,
@@ -17,32 +35,33 @@ def upcoming_concerts(request):
     }
     return render(request, 'concertsshower/upcoming_concerts.html', context)
 
+@condition_on_versions(*CONCERT_TABLES)
+@cache_public_page(*CONCERT_TABLES)
 def all_concerts(request):
     now = timezone.now()
     search_query = request.GET.get('search', '')
     from_date = request.GET.get('from_date')
     to_date = request.GET.get('to_date')
     
-    concerts_list = Concert.objects.all().order_by('-concert_date')
+    concerts_list = Concert.objects.all()
+    ordering = ARCHIVE_ORDERING
     
     if search_query:
-        concerts_list = concerts_list.filter(
-            Q(concert_title__icontains=search_query) | 
-            Q(venue_address__icontains=search_query)
-        )
+        concerts_list = search_concerts(concerts_list, search_query)
+        if 'search_rank' in concerts_list.query.annotations:
+            ordering = ('-search_rank',) + ARCHIVE_ORDERING
     
-    if from_date:
-        concerts_list = concerts_list.filter(concert_date__date__gte=from_date)
-    
-    if to_date:
-        concerts_list = concerts_list.filter(concert_date__date__lte=to_date)
+    concerts_list = filter_day_range(concerts_list, 'concert_date', from_date, to_date)
         
-    paginator = Paginator(concerts_list, 9)
-    page_number = request.GET.get('page')
-    concerts = paginator.get_page(page_number)
+    paginator = KeysetPaginator(concerts_list, ordering, ARCHIVE_PER_PAGE)
+    concerts = paginator.get_page(request.GET.get('cursor'))
+    total, total_is_estimate = estimate_count(concerts_list)
     
     context = {
         'concerts': concerts,
+        'total': total,
+        'total_is_estimate': total_is_estimate,
+        'cache_version': versions_stamp(*CONCERT_TABLES),
         'now': now,
         'search_query': search_query,
         'from_date': from_date,
@@ -50,6 +69,8 @@ def all_concerts(request):
     }
     return render(request, 'concertsshower/all_concerts.html', context)
 
+@condition_on_versions(*CONCERT_TABLES)
+@cache_public_page(*CONCERT_TABLES)
 def concert_detail(request, pk):
     concert = get_object_or_404(Concert, pk=pk)
     performances = concert.performances.all().select_related('band').order_by('performance_order')
@@ -57,6 +78,69 @@ def concert_detail(request, pk):
     context = {
         'concert': concert,
         'performances': performances,
+        'cache_version': versions_stamp(*CONCERT_TABLES),
         'now': timezone.now(),
     }
-    return render(request, 'concertsshower/concert_detail.html', context)
\ No newline at end of file
+    return render(request, 'concertsshower/concert_detail.html', context)
+
+def concert_calendar(request, year=None, month=None):
+    today = timezone.localdate()
+    if year is None:
+        year, month = today.year, today.month
+    if not (1 <= month <= 12 and 1900 <= year <= 2100):
+        raise Http404
+    
+    # Один GROUP BY на месяц, результат кэшируется до изменения концертов месяца.
+    days = cached_month_days(year, month)
+    previous_month = (year - 1, 12) if month == 1 else (year, month - 1)
+    next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    
+    context = {
+        'month_start': date(year, month, 1),
+        'weeks': month_weeks(year, month, days),
+        'weekdays': WEEKDAYS,
+        'today': today,
+        'total': sum(day['count'] for day in days.values()),
+        'previous_month': previous_month,
+        'next_month': next_month,
+    }
+    return render(request, 'concertsshower/calendar.html', context)
+
+def concerts_feed_etag(request, band_id=None):
+    since = feed_window_start(FEED_PAST_DAYS)
+    return versions_etag('concerts-ics', *CONCERT_TABLES, extra=f"{band_id or 'all'}-{since:%Y%m%d}")
+
+
+def concerts_feed_last_modified(request, band_id=None):
+    return max(versions_last_modified(*CONCERT_TABLES), feed_window_start(FEED_PAST_DAYS))
+
+
+@require_GET
+@condition(etag_func=concerts_feed_etag, last_modified_func=concerts_feed_last_modified)
+def concerts_ical(request, band_id=None):
+    since = feed_window_start(FEED_PAST_DAYS)
+    name = "Концерты Encore"
+    filename = "concerts.ics"
+    if band_id is None:
+        concerts = Concert.objects.filter(concert_date__gte=since).order_by('concert_date', 'concert_id')
+    else:
+        band = get_object_or_404(Band, pk=band_id)
+        concerts = (
+            Performance.objects.filter(band=band, concert__concert_date__gte=since)
+            .select_related('concert')
+            .order_by('concert__concert_date', 'concert_id')
+        )
+        name = f"Концерты: {band.band_name}"
+        filename = f"concerts-{band.pk}.ics"
+
+    def events():
+        for row in concerts.iterator(chunk_size=500):
+            concert = row if band_id is None else row.concert
+            yield {
+                'uid': f'concert-{concert.pk}@encore',
+                'start': concert.concert_date,
+                'summary': concert.concert_title,
+                'location': concert.venue_address,
+            }
+
+    return calendar_response(name, events(), concerts_feed_last_modified(request), filename)
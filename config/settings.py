@@ -14,12 +14,14 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core.apps.CoreConfig',  
     'booking.apps.BookingConfig',
     'concertsshower.apps.ConcertsshowerConfig',
     'for_authorization.apps.ForAuthorizationConfig',
     'custom_admin.apps.CustomAdminConfig', 
     'groups.apps.GroupsConfig', 
+    'api.apps.ApiConfig',
 ]
 
 AUTH_USER_MODEL = 'for_authorization.MusicianUser'
@@ -30,6 +32,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'for_authorization.middleware.CurrentMusicianMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -65,8 +68,42 @@ DATABASES = {
     }
 }
 
+# default — вытесняемый кэш (страницы, статистика, слоты); state — версии
+# таблиц (core.versioning) и ключи идемпотентности, которые вытеснять нельзя:
+# для него Redis запускается с maxmemory-policy noeviction (docker-compose.yml).
+# Без REDIS_URL — кэш в памяти процесса, только для разработки и тестов.
+REDIS_URL = os.environ.get('REDIS_URL')
+REDIS_STATE_URL = os.environ.get('REDIS_STATE_URL', REDIS_URL)
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+        'state': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_STATE_URL,
+            'KEY_PREFIX': 'state',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 50000},
+        },
+        'state': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'state',
+            'OPTIONS': {'MAX_ENTRIES': 10 ** 9},
+        },
+    }
+
 AUTH_PASSWORD_VALIDATORS = []
 
+TEST_RUNNER = 'core.testing.TestRunner'
+
 LANGUAGE_CODE = 'ru-ru'
 TIME_ZONE = 'Europe/Minsk'
 USE_I18N = True
@@ -76,4 +113,16 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Отдача медиафайлов (core.media): None — из Python через FileResponse,
+# 'x-accel-redirect' — nginx (internal-локация MEDIA_ACCEL_PREFIX с alias на
+# MEDIA_ROOT), 'x-sendfile' — Apache mod_xsendfile / lighttpd.
+MEDIA_SENDFILE = None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# Миниатюры логотипов строятся в фоновом потоке (core.images).
+LOGO_THUMBNAILS_ASYNC = True
+
+# Пересборка upcoming_lineups идёт в фоновом потоке (core.lineups).
+LINEUPS_REFRESH_ASYNC = True
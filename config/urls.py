@@ -1,8 +1,10 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.contrib.auth import views as auth_views
 from django.conf import settings
-from django.conf.urls.static import static
+from core.media import serve_media
 from for_authorization.views import home, custom_login, custom_logout, RegisterView, ProfileView, ProfileUpdateView, change_password
 
 urlpatterns = [
@@ -11,6 +13,8 @@ urlpatterns = [
     path('book/', include('booking.urls')),
     path('concerts/', include('concertsshower.urls')),
     path('groups/', include('groups.urls', namespace='groups')),
+    path('api/v1/', include('api.urls')),
+    path('', include('core.urls')),
     
     path('', home, name='home'),
     path('login/', custom_login, name='login'),
@@ -44,5 +48,7 @@ urlpatterns = [
          name='password_reset_complete'),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+# Медиафайлы отдаются и без DEBUG: сами байты при MEDIA_SENDFILE передаёт веб-сервер.
+urlpatterns += [
+    re_path(rf'^{re.escape(settings.MEDIA_URL.strip("/"))}/(?P<path>.+)$', serve_media, name='media'),
+]
\ No newline at end of file
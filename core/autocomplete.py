@@ -0,0 +1,68 @@
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Upper
+
+from .models import Band, BandMembership, Concert, Musician
+from .search import BAND_SEARCH, CONCERT_SEARCH, MUSICIAN_SEARCH, trigram_threshold
+
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+
+class AutocompleteSource:
+    """
+    Источник вариантов для виджетов автодополнения.
+
+    Поиск выполняет общий сервис core.search: префикс или похожее слово,
+    лучшие совпадения первыми.
+    """
+
+    def __init__(self, model, search, label, staff_only=False, filters=None):
+        self.model = model
+        self.search_service = search
+        self.label = label
+        self.staff_only = staff_only
+        self.filters = filters or {}
+
+    def search(self, term, limit=20, offset=0, params=None):
+        queryset = self.model.objects.all()
+        for name, apply_filter in self.filters.items():
+            value = (params or {}).get(name)
+            if value:
+                queryset = apply_filter(queryset, value)
+
+        ordering = [Upper(field) for field in self.search_service.fields] + [self.model._meta.pk.name]
+        queryset = self.search_service.search(queryset, term, ordering)
+        with trigram_threshold():
+            rows = list(queryset[offset:offset + limit + 1])
+        return [(obj.pk, self.label(obj)) for obj in rows[:limit]], len(rows) > limit
+
+
+def band_member_exists(band_id):
+    return Exists(BandMembership.objects.filter(band_id=band_id, musician_id=OuterRef('pk')))
+
+
+def exclude_band_members(queryset, band_id):
+    """
+    Музыканты не из группы: анти-JOIN NOT EXISTS по индексу
+    (band_id, musician_id) вместо списка id участников.
+    """
+    if not str(band_id).isdigit():
+        return queryset
+    return queryset.filter(~band_member_exists(band_id))
+
+
+AUTOCOMPLETE_SOURCES = {
+    'bands': AutocompleteSource(
+        Band, BAND_SEARCH,
+        label=lambda band: band.band_name,
+    ),
+    'concerts': AutocompleteSource(
+        Concert, CONCERT_SEARCH,
+        label=lambda concert: f"{concert.concert_title} ({concert.concert_date:%d.%m.%Y})",
+    ),
+    'musicians': AutocompleteSource(
+        Musician, MUSICIAN_SEARCH,
+        label=str,
+        staff_only=True,
+        filters={'exclude_band': exclude_band_members},
+    ),
+}
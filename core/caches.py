@@ -0,0 +1,6 @@
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+
+# Кэш без вытеснения (алиас state в CACHES): версии таблиц и ключи
+# идемпотентности должны жить, пока их не перезапишут или не истечёт срок.
+state_cache = ConnectionProxy(caches, 'state')
@@ -0,0 +1,65 @@
+from django.core.checks import Error, Warning, register
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+
+from .schema import expected_tables, find_drift, load_manifest
+
+
+def managed_columns():
+    """Столбцы, которые создаются миграциями управляемых моделей."""
+    columns = {}
+    for table, models in expected_tables().items():
+        for model in models:
+            if model._meta.managed:
+                columns.setdefault(table, set()).update(
+                    field.column for field in model._meta.concrete_fields
+                )
+    return columns
+
+
+@register('schema')
+def schema_manifest_check(app_configs, **kwargs):
+    try:
+        manifest = load_manifest(DEFAULT_DB_ALIAS)
+    except DatabaseError as e:
+        return [Warning(
+            f'Не удалось прочитать структуру базы данных: {e}',
+            hint='Манифест схемы будет недоступен до следующего запуска.',
+            id='core.W001',
+        )]
+
+    messages = []
+    missing_tables = []
+    pending = managed_columns()
+    for model, table, missing in find_drift(manifest):
+        if app_configs is not None and model._meta.app_config not in app_configs:
+            continue
+        if missing is None:
+            if table not in missing_tables:
+                missing_tables.append(table)
+        elif model._meta.managed:
+            messages.append(Warning(
+                f'В таблице "{table}" нет столбцов: {", ".join(missing)}.',
+                hint='Примените миграции: python manage.py migrate',
+                obj=model,
+                id='core.W003',
+            ))
+        else:
+            # Столбцы управляемой модели той же таблицы появятся после
+            # migrate — об этом уже предупреждает core.W003.
+            missing = [column for column in missing if column not in pending.get(table, ())]
+            if not missing:
+                continue
+            messages.append(Error(
+                f'Неуправляемая модель ссылается на отсутствующие столбцы '
+                f'таблицы "{table}": {", ".join(missing)}.',
+                obj=model,
+                id='core.E001',
+            ))
+
+    if missing_tables:
+        messages.insert(0, Warning(
+            f'В базе данных нет таблиц: {", ".join(missing_tables)}.',
+            hint='Примените миграции: python manage.py migrate',
+            id='core.W002',
+        ))
+    return messages
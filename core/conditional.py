@@ -0,0 +1,48 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.views.decorators.http import condition
+
+from .pagecache import PAGE_CACHE_TIMEOUT
+from .versioning import versions_etag, versions_last_modified
+
+# Страницы показывают «через 2 дня», «предстоящий»: валидаторы меняются не
+# реже раза в TIME_BUCKET секунд — столько же устаревает и кэш страниц.
+TIME_BUCKET = PAGE_CACHE_TIMEOUT
+
+
+def has_pending_messages(request):
+    return 'messages' in request.COOKIES or bool(request.session.get('_messages'))
+
+
+def bucket_start(bucket=TIME_BUCKET):
+    now = datetime.now(tz=dt_timezone.utc).timestamp()
+    return datetime.fromtimestamp(now - now % bucket, tz=dt_timezone.utc)
+
+
+def condition_on_versions(*tables, bucket=TIME_BUCKET):
+    """
+    ETag и Last-Modified по версиям таблиц tables (core.versioning) и
+    текущему интервалу времени длиной bucket секунд.
+
+    Версии лежат в кэше и меняются при любом сохранении и удалении, поэтому
+    проверка не обращается к базе. Если ничего не изменилось, view не
+    вызывается и клиент получает 304.
+
+    ETag включает пользователя: страница содержит личное меню. Пока есть
+    непоказанные сообщения, валидаторы не выдаются — иначе 304 скрыл бы их.
+    """
+    def validators_allowed(request):
+        return request.method in ('GET', 'HEAD') and not has_pending_messages(request)
+
+    def etag(request, *args, **kwargs):
+        if not validators_allowed(request):
+            return None
+        extra = f'{request.user.pk or 0}-{bucket_start(bucket).timestamp():.0f}'
+        return versions_etag('page', *tables, extra=extra)
+
+    def last_modified(request, *args, **kwargs):
+        if not validators_allowed(request):
+            return None
+        return max(versions_last_modified(*tables), bucket_start(bucket))
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models import Q
+
+from .expressions import RehearsalSpan
+from .locks import advisory_xact_lock, rehearsal_lock_keys
+from .models import Rehearsal
+
+
+def rehearsal_end(start, duration_minutes):
+    return start + timedelta(minutes=duration_minutes)
+
+
+def overlapping_rehearsals(start, duration_minutes, band=None, location=None, exclude_pk=None):
+    """
+    Репетиции того же места или той же группы, пересекающиеся с интервалом.
+
+    Фильтр повторяет выражение exclusion-ограничений, поэтому запрос
+    обслуживается их GiST-индексами.
+    """
+    return rehearsals_in_range(
+        start, rehearsal_end(start, duration_minutes),
+        band=band, location=location, exclude_pk=exclude_pk,
+    )
+
+
+def rehearsals_in_range(start, end, band=None, location=None, exclude_pk=None):
+    same_slot = Q()
+    if band is not None:
+        same_slot |= Q(band=band)
+    if location:
+        same_slot |= Q(location=location)
+    if not same_slot:
+        return Rehearsal.objects.none()
+
+    queryset = Rehearsal.objects.annotate(
+        span=RehearsalSpan('rehearsal_date', 'duration_minutes')
+    ).filter(same_slot, span__overlap=DateTimeTZRange(start, end))
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    return queryset
+
+
+def reserve_rehearsal(form):
+    """
+    Сохраняет репетицию из валидной формы под блокировками места и группы.
+
+    Проверка пересечений повторяется уже под блокировкой: два одновременных
+    запроса на один слот выполняются по очереди, и второй получает ошибку
+    формы, а не IntegrityError от exclusion-ограничения.
+    """
+    rehearsal = form.instance
+    with transaction.atomic():
+        advisory_xact_lock(*rehearsal_lock_keys(rehearsal.band_id, rehearsal.location))
+        try:
+            rehearsal.validate_constraints()
+        except ValidationError as e:
+            form.add_error(None, e)
+            return None
+        return form.save()
+
+
+CONFLICTS_SQL = """
+    SELECT a.rehearsal_id, b.rehearsal_id, '{reason}'
+    FROM rehearsals a
+    JOIN rehearsals b
+      ON a.rehearsal_id < b.rehearsal_id
+     AND a.{column} = b.{column}
+     AND tstzrange(a.rehearsal_date, a.rehearsal_date + make_interval(mins => a.duration_minutes))
+      && tstzrange(b.rehearsal_date, b.rehearsal_date + make_interval(mins => b.duration_minutes))
+"""
+
+
+def find_all_conflicts():
+    """
+    Все пары пересекающихся репетиций: [(id, id, 'location' | 'band'), ...].
+
+    Считается по исходным столбцам, поэтому работает и до того, как
+    exclusion-ограничения созданы (например, для чистки старых данных).
+    """
+    sql = ' UNION '.join([
+        CONFLICTS_SQL.format(column='location', reason='location'),
+        CONFLICTS_SQL.format(column='band_id', reason='band'),
+    ])
+    with connection.cursor() as cursor:
+        cursor.execute(sql + ' ORDER BY 1, 2')
+        return cursor.fetchall()
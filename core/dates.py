@@ -0,0 +1,49 @@
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+
+def local_tz():
+    return ZoneInfo(settings.TIME_ZONE)
+
+
+def local_midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min), local_tz())
+
+
+def day_range(date_from=None, date_to=None):
+    """
+    Полуоткрытый интервал [начало date_from, начало дня после date_to)
+    в местном времени. Границы — aware datetime, None — без ограничения.
+    """
+    start = local_midnight(date_from) if date_from else None
+    end = local_midnight(date_to + timedelta(days=1)) if date_to else None
+    return start, end
+
+
+def filter_day_range(queryset, field, date_from=None, date_to=None):
+    """
+    Фильтр по датам без field__date: сравнение с timestamptz напрямую,
+    чтобы работал B-tree индекс по полю. Даты — date или строки ISO;
+    некорректные значения игнорируются.
+    """
+    if isinstance(date_from, str):
+        date_from = _parse(date_from)
+    if isinstance(date_to, str):
+        date_to = _parse(date_to)
+    start, end = day_range(date_from, date_to)
+    if start is not None:
+        queryset = queryset.filter(**{f'{field}__gte': start})
+    if end is not None:
+        queryset = queryset.filter(**{f'{field}__lt': end})
+    return queryset
+
+
+def _parse(value):
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
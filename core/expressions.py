@@ -0,0 +1,23 @@
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.db.models import Func
+
+
+class RehearsalSpan(Func):
+    """
+    tstzrange [начало, начало + N минут) для репетиции.
+
+    Конец интервала считается в UTC, чтобы выражение оставалось IMMUTABLE
+    и его можно было использовать в индексах и exclusion-ограничениях.
+    """
+    arity = 2
+    output_field = DateTimeRangeField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        start, minutes = self.get_source_expressions()
+        start_sql, start_params = compiler.compile(start)
+        minutes_sql, minutes_params = compiler.compile(minutes)
+        sql = (
+            f"tstzrange({start_sql}, timezone('UTC', timezone('UTC', {start_sql}) "
+            f"+ make_interval(mins => {minutes_sql})))"
+        )
+        return sql, (*start_params, *start_params, *minutes_params)
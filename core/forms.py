@@ -2,6 +2,31 @@ from django import forms
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from .models import Musician, Band, Concert, BandMembership
+from .widgets import AutocompleteSelect
+
+
+def check_phone(phone):
+    if not phone.startswith('+375'):
+        raise ValidationError('Phone must start with +375')
+    if len(phone) != 13:
+        raise ValidationError('Phone must be 13 characters long')
+
+
+def check_telegram(telegram):
+    if telegram and not telegram.startswith('@'):
+        raise ValidationError('Telegram username must start with @')
+
+
+def check_join_date(join_date):
+    if join_date > timezone.localdate():
+        raise ValidationError('Join date cannot be in the future')
+
+
+# Правила MusicianForm по полям — их же применяет импорт состава (core.roster).
+MUSICIAN_RULES = {
+    'phone': check_phone,
+    'telegram': check_telegram,
+}
 
 
 class MusicianForm(forms.ModelForm):
@@ -11,16 +36,12 @@ class MusicianForm(forms.ModelForm):
     
     def clean_phone(self):
         phone = self.cleaned_data.get('phone')
-        if not phone.startswith('+375'):
-            raise ValidationError('Phone must start with +375')
-        if len(phone) != 13:
-            raise ValidationError('Phone must be 13 characters long')
+        check_phone(phone)
         return phone
     
     def clean_telegram(self):
         telegram = self.cleaned_data.get('telegram')
-        if telegram and not telegram.startswith('@'):
-            raise ValidationError('Telegram username must start with @')
+        check_telegram(telegram)
         return telegram
 
 
@@ -59,11 +80,12 @@ class BandMembershipForm(forms.ModelForm):
         model = BandMembership
         fields = '__all__'
         widgets = {
+            'band': AutocompleteSelect('bands'),
+            'musician': AutocompleteSelect('musicians'),
             'join_date': forms.DateInput(attrs={'type': 'date'}),
         }
     
     def clean_join_date(self):
         join_date = self.cleaned_data.get('join_date')
-        if join_date > timezone.now().date():
-            raise ValidationError('Join date cannot be in the future')
+        check_join_date(join_date)
         return join_date
@@ -0,0 +1,92 @@
+from datetime import timedelta, timezone as dt_timezone
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .dates import local_midnight
+
+ICAL_CONTENT_TYPE = 'text/calendar; charset=utf-8'
+PRODID = '-//Encore//Encore Calendar//RU'
+
+
+def feed_window_start(past_days):
+    """
+    Начало окна ленты: местная полночь past_days дней назад. Окно сдвигается
+    раз в сутки, поэтому день окна входит в ETag ленты.
+    """
+    return local_midnight(timezone.localdate() - timedelta(days=past_days))
+
+
+def escape_text(value):
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def format_datetime(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def fold_line(line):
+    """Перенос строк длиннее 75 октетов (RFC 5545, 3.1)."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts, current, size, limit = [], [], 0, 75
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > limit:
+            parts.append(''.join(current))
+            current, size, limit = [], 0, 74
+        current.append(char)
+        size += char_size
+    parts.append(''.join(current))
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def render_event(event, stamp):
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:{event['uid']}",
+        f'DTSTAMP:{format_datetime(stamp)}',
+        f"DTSTART:{format_datetime(event['start'])}",
+    ]
+    if event.get('end'):
+        lines.append(f"DTEND:{format_datetime(event['end'])}")
+    lines.append(f"SUMMARY:{escape_text(event['summary'])}")
+    if event.get('location'):
+        lines.append(f"LOCATION:{escape_text(event['location'])}")
+    if event.get('description'):
+        lines.append(f"DESCRIPTION:{escape_text(event['description'])}")
+    lines.append('END:VEVENT')
+    return ''.join(fold_line(line) for line in lines)
+
+
+def calendar_stream(name, events, stamp):
+    yield ''.join(fold_line(line) for line in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        f'X-WR-CALNAME:{escape_text(name)}',
+    ))
+    for event in events:
+        yield render_event(event, stamp)
+    yield fold_line('END:VCALENDAR')
+
+
+def calendar_response(name, events, stamp, filename):
+    """
+    Потоковый .ics: события пишутся по мере чтения из базы, поэтому
+    память не растёт вместе с размером календаря.
+    """
+    response = StreamingHttpResponse(
+        calendar_stream(name, events, stamp), content_type=ICAL_CONTENT_TYPE
+    )
+    response['Content-Disposition'] = f'inline; filename="{filename}"'
+    return response
@@ -0,0 +1,71 @@
+import hashlib
+from functools import wraps
+
+from django.http import HttpResponse, HttpResponseRedirect
+
+from .caches import state_cache
+
+IDEMPOTENCY_TTL = 60 * 60 * 24
+# Пока исходный запрос выполняется, ключ помечен как "занят". Метка живёт
+# недолго, чтобы упавший процесс не заблокировал ключ на сутки.
+PENDING_TTL = 30
+PENDING = 'pending'
+
+
+def request_owner(request):
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    if request.session.session_key is None:
+        # Сессия создаётся при первом POST с ключом; cookie выставит
+        # SessionMiddleware, и повтор придёт уже с ней.
+        request.session.save()
+    return f'session:{request.session.session_key}'
+
+
+def idempotency_cache_key(request, key, owner):
+    # Ключ придумывает клиент, поэтому он действует только в пределах
+    # пользователя (или сессии анонима): чужой ключ не вернёт чужой ответ.
+    digest = hashlib.sha256(f'{owner}:{request.path}:{key}'.encode()).hexdigest()
+    return f'idempotency:{digest}'
+
+
+def idempotent(view):
+    """
+    Повторный POST с тем же ключом идемпотентности (поле idempotency_key
+    или заголовок Idempotency-Key) не выполняет view ещё раз, а возвращает
+    сохранённый результат — редирект, которым закончился исходный запрос.
+
+    Неуспешные ответы (форма с ошибками) не запоминаются, чтобы исправленную
+    форму можно было отправить с тем же ключом.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get('Idempotency-Key') or request.POST.get('idempotency_key')
+        if request.method != 'POST' or not key:
+            return view(request, *args, **kwargs)
+
+        cache_key = idempotency_cache_key(request, key, request_owner(request))
+        if not state_cache.add(cache_key, PENDING, PENDING_TTL):
+            stored = state_cache.get(cache_key)
+            # Не ждём исходный запрос: воркер не должен простаивать.
+            if stored == PENDING:
+                return HttpResponse('Запрос уже обрабатывается', status=409)
+            if stored is not None:
+                return HttpResponseRedirect(stored['location'], status=stored['status'])
+            # Исходный запрос завершился ошибкой — выполняем как новый.
+
+        try:
+            response = view(request, *args, **kwargs)
+        except Exception:
+            state_cache.delete(cache_key)
+            raise
+
+        if response.status_code in (301, 302, 303, 307, 308):
+            state_cache.set(cache_key, {
+                'status': response.status_code,
+                'location': response['Location'],
+            }, IDEMPOTENCY_TTL)
+        else:
+            state_cache.delete(cache_key)
+        return response
+    return wrapper
@@ -0,0 +1,120 @@
+import hashlib
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from .versioning import bump_versions
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZES = (64, 128, 256)
+THUMBNAIL_DIR = 'band_logos/thumbs'
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='logo-thumbnails')
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def encode(image, fmt):
+    """
+    Сохранить в байты. Метаданные не переносятся: Pillow пишет EXIF, ICC
+    и текстовые блоки PNG, только если их передать явно.
+    """
+    buffer = io.BytesIO()
+    if fmt == 'WEBP':
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=6)
+    elif fmt == 'PNG':
+        image.save(buffer, 'PNG', optimize=True)
+    else:
+        image.convert('RGB').save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def save_hashed(data, size, extension):
+    """Имя файла — хэш содержимого, поэтому существующий файл не перезаписывается."""
+    name = f'{THUMBNAIL_DIR}/{content_hash(data)}-{size}.{extension}'
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(data))
+    return name
+
+
+def build_thumbnails(source):
+    """
+    Квадратные миниатюры THUMBNAIL_SIZES в исходном формате (PNG для
+    изображений с прозрачностью, иначе JPEG) и в WebP.
+
+    Возвращает {'source': имя оригинала, 'sizes': {размер: {'fallback', 'webp'}}}.
+    """
+    with default_storage.open(source, 'rb') as f:
+        image = Image.open(f)
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    fallback_format, fallback_extension = ('PNG', 'png') if has_alpha else ('JPEG', 'jpg')
+    sizes = {}
+    for size in THUMBNAIL_SIZES:
+        thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        sizes[str(size)] = {
+            'fallback': save_hashed(encode(thumbnail, fallback_format), size, fallback_extension),
+            'webp': save_hashed(encode(thumbnail, 'WEBP'), size, 'webp'),
+        }
+    return {'source': source, 'sizes': sizes}
+
+
+def update_band_thumbnails(band_id):
+    """Построить миниатюры логотипа группы и сохранить их в logo_thumbnails."""
+    from .models import Band
+
+    band = Band.objects.filter(pk=band_id).only('logo', 'logo_thumbnails').first()
+    if band is None or not band.logo or band.logo_thumbnails.get('source') == band.logo.name:
+        return
+    try:
+        thumbnails = build_thumbnails(band.logo.name)
+    except (OSError, Image.DecompressionBombError):
+        logger.exception('Не удалось построить миниатюры логотипа группы %s', band_id)
+        return
+    # Логотип могли сменить, пока строились миниатюры, — тогда не записываем.
+    updated = Band.objects.filter(pk=band_id, logo=band.logo.name).update(logo_thumbnails=thumbnails)
+    if updated:
+        bump_versions('bands')
+
+
+def run_in_background(band_id):
+    try:
+        update_band_thumbnails(band_id)
+    except Exception:
+        logger.exception('Ошибка фоновой обработки логотипа группы %s', band_id)
+    finally:
+        # У потока свои подключения к БД — закрываем, чтобы не копились.
+        connections.close_all()
+
+
+def schedule_thumbnails(band_id):
+    """
+    Построить миниатюры после коммита. Обработка идёт в фоновом потоке,
+    чтобы запрос с загрузкой логотипа не ждал Pillow; при
+    LOGO_THUMBNAILS_ASYNC = False (тесты) — сразу.
+    """
+    def run():
+        if getattr(settings, 'LOGO_THUMBNAILS_ASYNC', True):
+            _executor.submit(run_in_background, band_id)
+        else:
+            update_band_thumbnails(band_id)
+
+    transaction.on_commit(run)
+
+
+def logo_changed(sender, instance, **kwargs):
+    if instance.logo and instance.logo_thumbnails.get('source') != instance.logo.name:
+        schedule_thumbnails(instance.pk)
@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .versioning import bump_versions
+
+logger = logging.getLogger(__name__)
+
+LINEUPS_VIEW = 'upcoming_lineups'
+# Пауза перед пересборкой: изменения, пришедшие за это время, попадут
+# в одну пересборку вместо очереди из REFRESH.
+REFRESH_DELAY = 2
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='lineups-refresh')
+_queued = set()
+_queued_lock = threading.Lock()
+
+# {модель: поля} для моделей, которые попадают в составы только через связи.
+LINEUP_FIELDS = {}
+
+
+def refresh_upcoming_lineups(using=DEFAULT_DB_ALIAS):
+    """
+    Пересобрать upcoming_lineups. CONCURRENTLY не блокирует чтение:
+    афиша продолжает отдавать старые строки, пока строятся новые.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {LINEUPS_VIEW}')
+    bump_versions(LINEUPS_VIEW)
+
+
+def refresh_logged(using):
+    # Данные уже закоммичены: ошибка пересборки не должна превращаться
+    # в 500 для запроса, который их сохранил. Афиша догонит при следующей.
+    try:
+        refresh_upcoming_lineups(using)
+    except Exception:
+        logger.exception('Не удалось пересобрать %s', LINEUPS_VIEW)
+
+
+def run_in_background(using):
+    try:
+        time.sleep(REFRESH_DELAY)
+        # Снимаем отметку до пересборки: изменение, закоммиченное во время
+        # REFRESH, поставит в очередь ещё одну.
+        with _queued_lock:
+            _queued.discard(using)
+        refresh_logged(using)
+    finally:
+        connections.close_all()
+
+
+def queue_refresh(using):
+    """Не больше одной ожидающей пересборки на базу в этом процессе."""
+    with _queued_lock:
+        if using in _queued:
+            return
+        _queued.add(using)
+    _executor.submit(run_in_background, using)
+
+
+def schedule_refresh(using=DEFAULT_DB_ALIAS):
+    """
+    Обновить представление после коммита — один раз на транзакцию,
+    сколько бы концертов и выступлений в ней ни изменилось: первый
+    обработчик снимает отметку, остальные ничего не делают.
+
+    Пересборка идёт в фоновом потоке, чтобы запрос её не ждал; при
+    LINEUPS_REFRESH_ASYNC = False (тесты) — сразу.
+    """
+    connection = connections[using]
+    connection.lineups_dirty = True
+
+    def run():
+        if getattr(connection, 'lineups_dirty', False):
+            connection.lineups_dirty = False
+            if getattr(settings, 'LINEUPS_REFRESH_ASYNC', True):
+                queue_refresh(using)
+            else:
+                refresh_logged(using)
+
+    transaction.on_commit(run, using=using)
+
+
+def lineup_changed(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    schedule_refresh(using)
+
+
+def remember_lineup_values(sender, instance, raw=False, using=DEFAULT_DB_ALIAS, **kwargs):
+    instance._lineup_values = None
+    if instance.pk and not raw:
+        instance._lineup_values = sender._base_manager.using(using).filter(pk=instance.pk).values_list(
+            *LINEUP_FIELDS[sender]
+        ).first()
+
+
+def lineup_values_changed(sender, instance, created, using=DEFAULT_DB_ALIAS, **kwargs):
+    # Новая запись ещё не входит ни в один состав.
+    if created:
+        return
+    values = tuple(getattr(instance, sender._meta.get_field(name).attname) for name in LINEUP_FIELDS[sender])
+    if values != getattr(instance, '_lineup_values', None):
+        schedule_refresh(using)
+
+
+def watch(model, fields=None):
+    """
+    Пересобирать афишу при изменении model. Если заданы fields — только
+    когда у существующей записи меняется одно из этих полей.
+    """
+    label = model._meta.label
+    if fields is None:
+        post_save.connect(lineup_changed, sender=model, dispatch_uid=f'lineups-save-{label}')
+    else:
+        LINEUP_FIELDS[model] = tuple(fields)
+        pre_save.connect(remember_lineup_values, sender=model, dispatch_uid=f'lineups-pre-save-{label}')
+        post_save.connect(lineup_values_changed, sender=model, dispatch_uid=f'lineups-save-{label}')
+    post_delete.connect(lineup_changed, sender=model, dispatch_uid=f'lineups-delete-{label}')
@@ -0,0 +1,17 @@
+from django.db import connection
+
+
+def advisory_xact_lock(*keys):
+    """
+    Транзакционные advisory-блокировки Postgres по строковым ключам.
+
+    Снимаются автоматически при завершении транзакции. Ключи берутся
+    в отсортированном порядке, чтобы два запроса не ждали друг друга по кругу.
+    """
+    with connection.cursor() as cursor:
+        for key in sorted(set(keys)):
+            cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [key])
+
+
+def rehearsal_lock_keys(band_id, location):
+    return [f'rehearsal:band:{band_id}', f'rehearsal:location:{location}']
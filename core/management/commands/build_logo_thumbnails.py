@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.images import update_band_thumbnails
+from core.models import Band
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит миниатюры логотипов групп, для которых их ещё нет '
+        '(например, после загрузки данных или сбоя фоновой обработки).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Перестроить миниатюры всех логотипов.')
+
+    def handle(self, *args, **options):
+        bands = Band.objects.exclude(logo='').exclude(logo__isnull=True).only('pk', 'logo', 'logo_thumbnails')
+        built = 0
+        for band in bands.iterator(chunk_size=100):
+            if options['all']:
+                Band.objects.filter(pk=band.pk).update(logo_thumbnails={})
+            elif band.logo_thumbnails.get('source') == band.logo.name:
+                continue
+            update_band_thumbnails(band.pk)
+            built += 1
+        self.stdout.write(self.style.SUCCESS(f'Обработано логотипов: {built}.'))
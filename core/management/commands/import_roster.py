@@ -0,0 +1,41 @@
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from core.roster import ROSTER_BATCH_SIZE, import_roster
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует музыкантов и их членство в группах из CSV. '
+        'Ошибочные строки пропускаются и попадают в отчёт.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV в UTF-8 с заголовком')
+        parser.add_argument('--batch-size', type=int, default=ROSTER_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Только проверить файл.')
+        parser.add_argument('--errors', help='Записать отчёт об ошибках в CSV-файл.')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as f:
+                report = import_roster(f, options['batch_size'], options['dry_run'])
+        except (OSError, ValidationError) as e:
+            raise CommandError(e)
+
+        if options['errors']:
+            with open(options['errors'], 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['line', 'errors'])
+                for line, messages in report.errors:
+                    writer.writerow([line, '; '.join(messages)])
+        else:
+            for line, messages in report.errors:
+                self.stderr.write(f"Строка {line}: {'; '.join(messages)}")
+
+        verb = 'Проверено' if options['dry_run'] else 'Импортировано'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} строк: {report.imported} из {report.rows}, с ошибками: {len(report.errors)}.'
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from core.lineups import refresh_upcoming_lineups
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает материализованное представление upcoming_lineups. '
+        'Запускайте раз в сутки по cron, чтобы убрать прошедшие концерты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        refresh_upcoming_lineups(options['database'])
+        self.stdout.write(self.style.SUCCESS('Афиша обновлена.'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.conflicts import find_all_conflicts
+from core.models import Rehearsal
+
+
+class Command(BaseCommand):
+    help = 'Выводит все пары пересекающихся репетиций (одно место или одна группа)'
+
+    def handle(self, *args, **options):
+        conflicts = find_all_conflicts()
+        if not conflicts:
+            self.stdout.write(self.style.SUCCESS('Пересечений не найдено.'))
+            return
+
+        ids = {pk for first, second, _ in conflicts for pk in (first, second)}
+        rehearsals = Rehearsal.objects.select_related('band').in_bulk(ids)
+        reasons = {'location': 'место', 'band': 'группа'}
+        for first, second, reason in conflicts:
+            a, b = rehearsals[first], rehearsals[second]
+            self.stdout.write(
+                f'#{a.pk} {a.band.band_name}, {a.location}, {a.rehearsal_date:%d.%m.%Y %H:%M} '
+                f'<-> #{b.pk} {b.band.band_name}, {b.location}, {b.rehearsal_date:%d.%m.%Y %H:%M} '
+                f'({reasons[reason]})'
+            )
+        self.stdout.write(self.style.WARNING(f'Всего пересечений: {len(conflicts)}'))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+
+from core.schema import find_drift, load_manifest
+
+
+class Command(BaseCommand):
+    help = 'Показывает структуру таблиц проекта и расхождения моделей со схемой БД'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--table', action='append', dest='tables', default=[])
+
+    def handle(self, *args, **options):
+        try:
+            manifest = load_manifest(options['database'])
+        except DatabaseError as e:
+            raise CommandError(f'Не удалось прочитать структуру базы данных: {e}')
+
+        for table, columns in sorted(manifest.items()):
+            if options['tables'] and table not in options['tables']:
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(table))
+            for column in columns:
+                self.stdout.write(f'  {column}')
+
+        drift = find_drift(manifest)
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Схема соответствует моделям.'))
+            return
+        for model, table, missing in drift:
+            label = model._meta.label
+            if missing is None:
+                self.stdout.write(self.style.WARNING(f'{label}: нет таблицы "{table}"'))
+            else:
+                self.stdout.write(self.style.WARNING(
+                    f'{label}: в "{table}" нет столбцов {", ".join(missing)}'
+                ))
@@ -0,0 +1,131 @@
+import hashlib
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+# Файлы с хэшем содержимого в имени (см. core.images) не меняются никогда.
+HASHED_NAME = re.compile(r'(^|/)[0-9a-f]{16}-\d+\.\w+$')
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE = 'public, max-age=3600'
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def cache_control(path):
+    return IMMUTABLE_CACHE if HASHED_NAME.search(path) else DEFAULT_CACHE
+
+
+def file_etag(stat):
+    return '"%s"' % hashlib.md5(f'{stat.st_mtime_ns}-{stat.st_size}'.encode()).hexdigest()
+
+
+def parse_range(header, size):
+    """
+    (start, end) включительно для одного диапазона bytes=..., None — если
+    заголовка нет или он не поддерживается (тогда отдаётся весь файл).
+    ValueError — диапазон за пределами файла (416).
+    """
+    match = RANGE.match(header or '')
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def range_applies(request, etag, last_modified):
+    """If-Range: диапазон действует, только если файл не изменился."""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def offloaded_response(path, relative, content_type):
+    """Пустой ответ, файл отдаёт веб-сервер (nginx / Apache, lighttpd)."""
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SENDFILE == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + relative
+    else:
+        response['X-Sendfile'] = path
+    return response
+
+
+def file_response(request, path, stat, content_type, etag):
+    try:
+        byte_range = parse_range(request.headers.get('Range'), stat.st_size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+
+    if byte_range and range_applies(request, etag, int(stat.st_mtime)):
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(read_range(path, start, length), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = str(length)
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Отдача файлов MEDIA_ROOT.
+
+    При MEDIA_SENDFILE передача байтов поручается веб-серверу заголовком
+    X-Accel-Redirect или X-Sendfile, и воркер освобождается сразу. Без него
+    файл отдаётся FileResponse с поддержкой Range и условных запросов.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    relative = os.path.relpath(full_path, os.path.abspath(settings.MEDIA_ROOT)).replace(os.sep, '/')
+
+    stat = os.stat(full_path)
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        if settings.MEDIA_SENDFILE:
+            response = offloaded_response(full_path, relative, content_type)
+        else:
+            response = file_response(request, full_path, stat, content_type, etag)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = cache_control(relative)
+    return response
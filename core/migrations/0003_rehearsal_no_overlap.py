@@ -0,0 +1,47 @@
+# Generated by Django 5.2.9 on 2026-10-18 05:32
+
+import core.expressions
+import django.contrib.postgres.constraints
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+
+OVERLAPS_SQL = """
+    SELECT count(*) FROM rehearsals a
+    JOIN rehearsals b ON a.rehearsal_id < b.rehearsal_id
+     AND (a.location = b.location OR a.band_id = b.band_id)
+     AND tstzrange(a.rehearsal_date, a.rehearsal_date + make_interval(mins => a.duration_minutes))
+      && tstzrange(b.rehearsal_date, b.rehearsal_date + make_interval(mins => b.duration_minutes))
+"""
+
+
+def ensure_no_overlaps(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(OVERLAPS_SQL)
+        (conflicts,) = cursor.fetchone()
+    if conflicts:
+        raise RuntimeError(
+            f'Найдено пересекающихся репетиций: {conflicts}. '
+            'Посмотрите список командой "python manage.py rehearsal_conflicts", '
+            'исправьте записи и повторите миграцию.'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_band_logo'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RunPython(ensure_no_overlaps, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='rehearsal',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(expressions=[('location', '='), (core.expressions.RehearsalSpan('rehearsal_date', 'duration_minutes'), '&&')], name='rehearsals_location_no_overlap', violation_error_message='Это место уже забронировано на выбранное время.'),
+        ),
+        migrations.AddConstraint(
+            model_name='rehearsal',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(expressions=[('band', '='), (core.expressions.RehearsalSpan('rehearsal_date', 'duration_minutes'), '&&')], name='rehearsals_band_no_overlap', violation_error_message='У группы уже есть репетиция в это время.'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-18 05:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_rehearsal_no_overlap'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rehearsal',
+            index=models.Index(fields=['rehearsal_date', 'rehearsal_id'], name='rehearsals_date_id_idx'),
+        ),
+    ]
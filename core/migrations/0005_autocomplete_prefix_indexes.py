@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-18 05:43
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_rehearsal_date_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='band',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('band_name'), name='text_pattern_ops'), name='bands_name_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='concert',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('concert_title'), name='text_pattern_ops'), name='concerts_title_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='musician',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('last_name'), name='text_pattern_ops'), name='musicians_last_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='musician',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('first_name'), name='text_pattern_ops'), name='musicians_first_prefix_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.9 on 2026-10-18 05:49
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_autocomplete_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='concert',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('concert_title', config='russian', weight='A'), '||', django.contrib.postgres.search.SearchVector('venue_address', config='russian', weight='B'), django.contrib.postgres.search.SearchConfig('russian')), '||', django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('concert_title', config='english', weight='A'), '||', django.contrib.postgres.search.SearchVector('venue_address', config='english', weight='B'), django.contrib.postgres.search.SearchConfig('english')), django.contrib.postgres.search.SearchConfig('russian')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='concert',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='concerts_search_vector_idx'),
+        ),
+    ]
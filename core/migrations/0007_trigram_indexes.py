@@ -0,0 +1,40 @@
+# Generated by Django 5.2.9 on 2026-10-18 05:52
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_concert_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='band',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['band_name'], name='bands_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='band',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['genre'], name='bands_genre_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='concert',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['concert_title'], name='concerts_title_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='concert',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['venue_address'], name='concerts_venue_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='musician',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['last_name'], name='musicians_last_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='musician',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['first_name'], name='musicians_first_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-18 05:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='concert',
+            index=models.Index(fields=['concert_date', 'concert_id'], name='concerts_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.9 on 2026-10-18 06:07
+
+from django.db import migrations, models
+
+
+CREATE_SQL = """
+    CREATE MATERIALIZED VIEW upcoming_lineups AS
+    SELECT c.concert_id, c.concert_title, c.venue_address, c.concert_date,
+           COALESCE(
+               jsonb_agg(
+                   jsonb_build_object(
+                       'order', p.performance_order,
+                       'band_id', b.band_id,
+                       'band_name', b.band_name
+                   ) ORDER BY p.performance_order, p.performance_id
+               ) FILTER (WHERE p.performance_id IS NOT NULL),
+               '[]'::jsonb
+           ) AS lineup
+    FROM concerts c
+    LEFT JOIN performances p ON p.concert_id = c.concert_id
+    LEFT JOIN bands b ON b.band_id = p.band_id
+    WHERE c.concert_date >= now() - interval '1 day'
+    GROUP BY c.concert_id;
+
+    CREATE UNIQUE INDEX upcoming_lineups_concert_idx ON upcoming_lineups (concert_id);
+    CREATE INDEX upcoming_lineups_date_idx ON upcoming_lineups (concert_date);
+"""
+
+DROP_SQL = "DROP MATERIALIZED VIEW IF EXISTS upcoming_lineups;"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+        migrations.CreateModel(
+            name='UpcomingLineup',
+            fields=[
+                ('concert_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('concert_title', models.CharField(max_length=200)),
+                ('venue_address', models.CharField(max_length=255)),
+                ('concert_date', models.DateTimeField()),
+                ('lineup', models.JSONField()),
+            ],
+            options={
+                'db_table': 'upcoming_lineups',
+                'managed': False,
+            },
+        ),
+    ]
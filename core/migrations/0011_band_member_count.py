@@ -0,0 +1,54 @@
+from django.db import migrations, models
+
+
+# Счётчик участников меняется в той же транзакции, что и band_membership,
+# при любом способе записи: ORM, bulk_create, импорт, SQL.
+TRIGGER_SQL = """
+    CREATE FUNCTION band_membership_count() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW.band_id = OLD.band_id THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            UPDATE bands SET member_count = member_count + 1 WHERE band_id = NEW.band_id;
+        END IF;
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+            UPDATE bands SET member_count = member_count - 1 WHERE band_id = OLD.band_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER band_membership_count
+    AFTER INSERT OR DELETE OR UPDATE OF band_id ON band_membership
+    FOR EACH ROW EXECUTE FUNCTION band_membership_count();
+
+    UPDATE bands b SET member_count = (
+        SELECT COUNT(*) FROM band_membership m WHERE m.band_id = b.band_id
+    );
+"""
+
+DROP_SQL = """
+    DROP TRIGGER IF EXISTS band_membership_count ON band_membership;
+    DROP FUNCTION IF EXISTS band_membership_count();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_upcoming_lineups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='band',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Участников'),
+        ),
+        migrations.AddIndex(
+            model_name='band',
+            index=models.Index(fields=['-member_count', 'band_id'], name='bands_member_count_idx'),
+        ),
+        migrations.RunSQL(TRIGGER_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 06:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_band_member_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='band',
+            name='logo_thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
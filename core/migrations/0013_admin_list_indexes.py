@@ -0,0 +1,25 @@
+# Generated by Django 5.2.9 on 2026-10-18 06:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_band_logo_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='band',
+            index=models.Index(fields=['band_name', 'band_id'], name='bands_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bandmembership',
+            index=models.Index(fields=['join_date', 'id'], name='memberships_join_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='musician',
+            index=models.Index(fields=['last_name', 'first_name', 'musician_id'], name='musicians_name_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_admin_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='band',
+            name='member_count',
+            field=models.PositiveIntegerField(db_default=0, default=0, editable=False, verbose_name='Участников'),
+        ),
+    ]
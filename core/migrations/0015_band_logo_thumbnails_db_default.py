@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_band_member_count_db_default'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='band',
+            name='logo_thumbnails',
+            field=models.JSONField(blank=True, db_default={}, default=dict, editable=False),
+        ),
+    ]
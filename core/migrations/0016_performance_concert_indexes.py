@@ -0,0 +1,21 @@
+# Generated by Django 5.2.9 on 2026-10-18 07:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_band_logo_thumbnails_db_default'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='performance',
+            index=models.Index(fields=['concert', 'performance_order', 'performance_id'], name='performances_concert_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='performance',
+            index=models.Index(fields=['-concert', 'performance_order', 'performance_id'], name='performances_concert_desc_idx'),
+        ),
+    ]
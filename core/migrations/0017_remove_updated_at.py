@@ -0,0 +1,37 @@
+# Generated by Django 5.2.9 on 2026-10-18 07:51
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_performance_concert_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='band',
+            name='updated_at',
+        ),
+        migrations.RemoveField(
+            model_name='bandmembership',
+            name='updated_at',
+        ),
+        migrations.RemoveField(
+            model_name='concert',
+            name='updated_at',
+        ),
+        migrations.RemoveField(
+            model_name='musician',
+            name='updated_at',
+        ),
+        migrations.RemoveField(
+            model_name='performance',
+            name='updated_at',
+        ),
+        migrations.RemoveField(
+            model_name='rehearsal',
+            name='updated_at',
+        ),
+    ]
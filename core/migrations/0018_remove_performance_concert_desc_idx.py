@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-18 08:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_remove_updated_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='performance',
+            name='performances_concert_desc_idx',
+        ),
+    ]
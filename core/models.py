@@ -1,7 +1,15 @@
 from django.db import models
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import RangeOperators
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import RegexValidator
+from django.db.models.functions import Upper
 from django.utils import timezone
 
+from .expressions import RehearsalSpan
+from .search import concert_search_vector
+
 
 class Musician(models.Model):
     INSTRUMENT_CHOICES = [
@@ -50,6 +58,13 @@ class Musician(models.Model):
     
     class Meta:
         db_table = 'musicians'
+        indexes = [
+            models.Index(fields=['last_name', 'first_name', 'musician_id'], name='musicians_name_idx'),
+            models.Index(OpClass(Upper('last_name'), name='text_pattern_ops'), name='musicians_last_prefix_idx'),
+            models.Index(OpClass(Upper('first_name'), name='text_pattern_ops'), name='musicians_first_prefix_idx'),
+            GinIndex(fields=['last_name'], opclasses=['gin_trgm_ops'], name='musicians_last_trgm_idx'),
+            GinIndex(fields=['first_name'], opclasses=['gin_trgm_ops'], name='musicians_first_trgm_idx'),
+        ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.instrument})"
@@ -85,9 +100,20 @@ class Band(models.Model):
     genre = models.CharField(max_length=50, choices=GENRE_CHOICES)
     founded_date = models.DateField(default=timezone.now)
     logo = models.ImageField(upload_to='band_logos/', blank=True, null=True, verbose_name='Логотип')
+    # Миниатюры логотипа строит core.images в фоне после сохранения.
+    logo_thumbnails = models.JSONField(default=dict, db_default={}, blank=True, editable=False)
+    # Поддерживается триггером band_membership_count (миграция 0011).
+    member_count = models.PositiveIntegerField(default=0, db_default=0, editable=False, verbose_name='Участников')
     
     class Meta:
         db_table = 'bands'
+        indexes = [
+            models.Index(fields=['-member_count', 'band_id'], name='bands_member_count_idx'),
+            models.Index(fields=['band_name', 'band_id'], name='bands_name_idx'),
+            models.Index(OpClass(Upper('band_name'), name='text_pattern_ops'), name='bands_name_prefix_idx'),
+            GinIndex(fields=['band_name'], opclasses=['gin_trgm_ops'], name='bands_name_trgm_idx'),
+            GinIndex(fields=['genre'], opclasses=['gin_trgm_ops'], name='bands_genre_trgm_idx'),
+        ]
     
     def __str__(self):
         return f"{self.band_name} ({self.genre})"
@@ -98,14 +124,45 @@ class Concert(models.Model):
     concert_title = models.CharField(max_length=200)
     venue_address = models.CharField(max_length=255)
     concert_date = models.DateTimeField(default=timezone.now)
+    search_vector = models.GeneratedField(
+        expression=concert_search_vector(),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     
     class Meta:
         db_table = 'concerts'
+        indexes = [
+            models.Index(OpClass(Upper('concert_title'), name='text_pattern_ops'), name='concerts_title_prefix_idx'),
+            models.Index(fields=['concert_date', 'concert_id'], name='concerts_date_id_idx'),
+            GinIndex(fields=['search_vector'], name='concerts_search_vector_idx'),
+            GinIndex(fields=['concert_title'], opclasses=['gin_trgm_ops'], name='concerts_title_trgm_idx'),
+            GinIndex(fields=['venue_address'], opclasses=['gin_trgm_ops'], name='concerts_venue_trgm_idx'),
+        ]
     
     def __str__(self):
         return f"{self.concert_title} at {self.venue_address}"
 
 
+class UpcomingLineup(models.Model):
+    """
+    Материализованное представление upcoming_lineups: предстоящий концерт
+    и его состав, собранный в JSON. Обновляется core.lineups.
+    """
+    concert_id = models.IntegerField(primary_key=True)
+    concert_title = models.CharField(max_length=200)
+    venue_address = models.CharField(max_length=255)
+    concert_date = models.DateTimeField()
+    lineup = models.JSONField()
+
+    class Meta:
+        managed = False
+        db_table = 'upcoming_lineups'
+
+    def __str__(self):
+        return self.concert_title
+
+
 class Performance(models.Model):
     performance_id = models.AutoField(primary_key=True)
     band = models.ForeignKey(Band, on_delete=models.CASCADE, db_column='band_id')
@@ -114,6 +171,9 @@ class Performance(models.Model):
     
     class Meta:
         db_table = 'performances'
+        indexes = [
+            models.Index(fields=['concert', 'performance_order', 'performance_id'], name='performances_concert_idx'),
+        ]
     
     def __str__(self):
         return f"{self.band} at {self.concert} (order: {self.performance_order})"
@@ -128,6 +188,27 @@ class Rehearsal(models.Model):
     
     class Meta:
         db_table = 'rehearsals'
+        indexes = [
+            models.Index(fields=['rehearsal_date', 'rehearsal_id'], name='rehearsals_date_id_idx'),
+        ]
+        constraints = [
+            ExclusionConstraint(
+                name='rehearsals_location_no_overlap',
+                expressions=[
+                    ('location', RangeOperators.EQUAL),
+                    (RehearsalSpan('rehearsal_date', 'duration_minutes'), RangeOperators.OVERLAPS),
+                ],
+                violation_error_message='Это место уже забронировано на выбранное время.',
+            ),
+            ExclusionConstraint(
+                name='rehearsals_band_no_overlap',
+                expressions=[
+                    ('band', RangeOperators.EQUAL),
+                    (RehearsalSpan('rehearsal_date', 'duration_minutes'), RangeOperators.OVERLAPS),
+                ],
+                violation_error_message='У группы уже есть репетиция в это время.',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.band} rehearsal at {self.location}"
@@ -141,6 +222,9 @@ class BandMembership(models.Model):
     class Meta:
         db_table = 'band_membership'
         unique_together = ('band', 'musician')
+        indexes = [
+            models.Index(fields=['join_date', 'id'], name='memberships_join_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.musician} in {self.band} since {self.join_date}"
\ No newline at end of file
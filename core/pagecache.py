@@ -0,0 +1,58 @@
+import hashlib
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .versioning import versions_stamp
+
+PAGE_CACHE_TIMEOUT = 60 * 5
+
+
+def page_cache_key(request, tables):
+    query = sorted((key, sorted(values)) for key, values in request.GET.lists())
+    digest = hashlib.md5(f'{request.path}?{query}'.encode()).hexdigest()
+    return f'page:{digest}:{versions_stamp(*tables)}'
+
+
+def is_cacheable_request(request):
+    # Для вошедших пользователей страница содержит личные данные (меню,
+    # имя), а непоказанные сообщения должны дойти до пользователя.
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+        and 'messages' not in request.COOKIES
+    )
+
+
+def cache_public_page(*tables, timeout=PAGE_CACHE_TIMEOUT):
+    """
+    Кэш целой страницы для анонимных посетителей.
+
+    Ключ включает путь, параметры запроса и версии таблиц tables, поэтому
+    изменение данных сразу делает старые копии недостижимыми. timeout
+    ограничивает устаревание всего, что зависит от текущего времени
+    («через 2 дня», «предстоящий»).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not is_cacheable_request(request):
+                return view(request, *args, **kwargs)
+
+            key = page_cache_key(request, tables)
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            response = view(request, *args, **kwargs)
+            if (
+                response.status_code == 200
+                and not response.streaming
+                and not response.cookies
+            ):
+                cache.set(key, (response.content, response['Content-Type']), timeout)
+            return response
+        return wrapper
+    return decorator
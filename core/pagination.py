@@ -0,0 +1,134 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def estimate_count(queryset, exact_below=1000):
+    """
+    Число строк по оценке планировщика (EXPLAIN) без полного COUNT(*).
+
+    Если оценка мала, дешевле и честнее посчитать точно.
+    Возвращает (count, is_estimate).
+    """
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    estimate = int(plan[0]['Plan']['Plan Rows'])
+    if estimate < exact_below:
+        return queryset.count(), False
+    return estimate, True
+
+
+class KeysetPage:
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Пагинация по курсору (keyset) вместо OFFSET.
+
+    ordering — уникальный набор полей сортировки, например
+    ('rehearsal_date', 'rehearsal_id'); последнее поле должно быть ключом.
+    В ordering можно указывать и аннотации queryset (например, ранг поиска).
+    Стоимость страницы не зависит от её номера, если по этим полям есть индекс.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.per_page = per_page
+        self.fields = []
+        self.attnames = []
+        for name in self.ordering:
+            name = name.lstrip('-')
+            annotation = queryset.query.annotations.get(name)
+            if annotation is not None:
+                self.fields.append(annotation.output_field)
+                self.attnames.append(name)
+            else:
+                field = queryset.model._meta.get_field(name)
+                self.fields.append(field)
+                self.attnames.append(field.attname)
+
+    def encode_cursor(self, obj, direction):
+        values = [getattr(obj, attname) for attname in self.attnames]
+        # isoformat, а не DjangoJSONEncoder: тот обрезает микросекунды,
+        # и курсор перестал бы совпадать со значением в базе.
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+        payload = json.dumps({'d': direction, 'v': values})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None, None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction, raw_values = payload['d'], payload['v']
+            if direction not in ('next', 'prev') or len(raw_values) != len(self.fields):
+                return None, None
+            values = [field.to_python(raw) for field, raw in zip(self.fields, raw_values)]
+        except (ValueError, TypeError, KeyError, ValidationError):
+            return None, None
+        return direction, values
+
+    def _after(self, values, ordering):
+        # (a, b) > (x, y)  =>  a >= x AND (a > x OR (a = x AND b > y)).
+        # Первое условие даёт планировщику границу для индексного диапазона.
+        condition = Q()
+        equal = {}
+        for name, value in zip(ordering, values):
+            column = name.lstrip('-')
+            op = 'lt' if name.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{column}__{op}': value})
+            equal[column] = value
+        first = ordering[0]
+        bound = {f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": values[0]}
+        return Q(**bound) & condition
+
+    def get_page(self, cursor=None):
+        direction, values = self.decode_cursor(cursor)
+        backwards = direction == 'prev'
+        ordering = self.ordering
+        if backwards:
+            ordering = [name[1:] if name.startswith('-') else f'-{name}' for name in ordering]
+
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._after(values, ordering))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or backwards:
+                next_cursor = self.encode_cursor(rows[-1], 'next')
+            if (has_more and backwards) or (values is not None and not backwards):
+                previous_cursor = self.encode_cursor(rows[0], 'prev')
+        return KeysetPage(rows, self, next_cursor, previous_cursor)
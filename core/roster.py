@@ -0,0 +1,215 @@
+import csv
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .forms import MUSICIAN_RULES, check_join_date
+from .locks import advisory_xact_lock
+from .models import Band, BandMembership, Musician
+from .versioning import bump_versions
+
+ROSTER_BATCH_SIZE = 500
+MUSICIAN_FIELDS = ('first_name', 'last_name', 'phone', 'telegram', 'instrument')
+BAND_FIELDS = ('band_name', 'genre')
+REQUIRED_COLUMNS = ('first_name', 'last_name', 'phone', 'instrument')
+ROSTER_COLUMNS = MUSICIAN_FIELDS + BAND_FIELDS + ('join_date',)
+
+
+class RosterRow:
+    def __init__(self, line, musician, band_name=None, genre=None, join_date=None):
+        self.line = line
+        self.musician = musician
+        self.band_name = band_name
+        self.genre = genre
+        self.join_date = join_date
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.errors = []
+
+    def add_error(self, line, messages):
+        self.errors.append((line, messages))
+
+
+def clean_value(model, name, raw):
+    """Значение столбца по правилам поля модели: тип, длина, варианты, валидаторы."""
+    field = model._meta.get_field(name)
+    value = (raw or '').strip()
+    if not value and field.null:
+        value = None
+    return field.clean(value, None)
+
+
+def clean_row(line, raw):
+    """
+    Проверить строку CSV. Возвращает (RosterRow, None) или (None, ошибки).
+
+    К полям применяются валидаторы моделей и правила MusicianForm, но без
+    создания формы и без запросов к БД — БД проверяется сразу для пачки.
+    """
+    errors, musician = [], {}
+    for name in MUSICIAN_FIELDS:
+        try:
+            value = clean_value(Musician, name, raw.get(name))
+            if value and name in MUSICIAN_RULES:
+                MUSICIAN_RULES[name](value)
+        except ValidationError as e:
+            errors.extend(f'{name}: {message}' for message in e.messages)
+        else:
+            musician[name] = value
+
+    band_name = (raw.get('band_name') or '').strip() or None
+    genre = join_date = None
+    if band_name:
+        try:
+            band_name = clean_value(Band, 'band_name', band_name)
+            if (raw.get('genre') or '').strip():
+                genre = clean_value(Band, 'genre', raw.get('genre'))
+            join_date = timezone.localdate()
+            if (raw.get('join_date') or '').strip():
+                join_date = clean_value(BandMembership, 'join_date', raw.get('join_date'))
+            check_join_date(join_date)
+        except ValidationError as e:
+            errors.extend(f'band: {message}' for message in e.messages)
+
+    if errors:
+        return None, errors
+    return RosterRow(line, musician, band_name, genre, join_date), None
+
+
+def resolve_bands(rows, report):
+    """
+    Группы пачки одним запросом. Новые группы создаются по первой строке
+    с жанром; строки с новой группой без жанра попадают в отчёт.
+    Возвращает ({имя: pk} найденных групп, {имя: жанр} новых, строки).
+    """
+    names = {row.band_name for row in rows if row.band_name}
+    bands = dict(Band.objects.filter(band_name__in=names).values_list('band_name', 'pk'))
+    new_bands, valid = {}, []
+    for row in rows:
+        if row.band_name and row.band_name not in bands and row.band_name not in new_bands:
+            if not row.genre:
+                report.add_error(row.line, [f'genre: нужен для новой группы «{row.band_name}»'])
+                continue
+            new_bands[row.band_name] = row.genre
+        valid.append(row)
+    return bands, new_bands, valid
+
+
+def create_bands(new_bands, bands):
+    """
+    Создать новые группы и дописать их в bands. band_name не уникален, и
+    параллельный импорт мог создать ту же группу после resolve_bands: имена
+    блокируются до конца транзакции и перепроверяются под блокировкой.
+    """
+    names = [name for name in new_bands if name not in bands]
+    if not names:
+        return
+    advisory_xact_lock(*(f'roster:band:{name}' for name in names))
+    bands.update(Band.objects.filter(band_name__in=names).values_list('band_name', 'pk'))
+    created = Band.objects.bulk_create(
+        [Band(band_name=name, genre=new_bands[name]) for name in names if name not in bands]
+    )
+    for band in created:
+        bands[band.band_name] = band.pk
+
+
+def write_rows(rows, bands, new_bands):
+    """Записать строки в текущей транзакции: группы, музыканты, членства."""
+    create_bands({row.band_name: new_bands[row.band_name] for row in rows if row.band_name in new_bands}, bands)
+    # В одной команде INSERT ... ON CONFLICT строка не может обновиться
+    # дважды, поэтому повторы внутри пачки схлопываются (побеждает последняя).
+    musicians = {row.musician['phone']: Musician(**row.musician) for row in rows}
+    saved = Musician.objects.bulk_create(
+        musicians.values(),
+        update_conflicts=True,
+        unique_fields=['phone'],
+        update_fields=['first_name', 'last_name', 'telegram', 'instrument'],
+    )
+    musician_ids = {musician.phone: musician.pk for musician in saved}
+    memberships = {
+        (bands[row.band_name], musician_ids[row.musician['phone']]): row
+        for row in rows if row.band_name
+    }
+    BandMembership.objects.bulk_create(
+        [
+            BandMembership(band_id=band_id, musician_id=musician_id, join_date=row.join_date)
+            for (band_id, musician_id), row in memberships.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['band', 'musician'],
+        update_fields=['join_date'],
+    )
+
+
+def save_rows_one_by_one(rows, bands, new_bands, report):
+    """
+    Одна строка, отвергнутая базой, откатывает всю пачку. Повтор по строке,
+    каждая в своей точке сохранения: в отчёт попадают только отвергнутые
+    строки, остальные сохраняются.
+    """
+    for row in rows:
+        row_bands = dict(bands)
+        try:
+            with transaction.atomic():
+                write_rows([row], row_bands, new_bands)
+        except DatabaseError as e:
+            report.add_error(row.line, [f'Ошибка сохранения: {e}'])
+        else:
+            bands = row_bands
+            report.imported += 1
+
+
+def save_batch(rows, report, dry_run=False):
+    bands, new_bands, rows = resolve_bands(rows, report)
+    if dry_run or not rows:
+        report.imported += len(rows)
+        return
+
+    try:
+        with transaction.atomic():
+            # Копия: после отката в ней остались бы id несозданных групп.
+            write_rows(rows, dict(bands), new_bands)
+    except DatabaseError:
+        save_rows_one_by_one(rows, bands, new_bands, report)
+    else:
+        report.imported += len(rows)
+
+
+def import_roster(f, batch_size=ROSTER_BATCH_SIZE, dry_run=False):
+    """
+    Импорт состава из CSV (файл читается построчно).
+
+    Столбцы: first_name, last_name, phone, telegram, instrument — музыкант;
+    band_name, genre, join_date — необязательное членство в группе.
+    Музыканты обновляются по телефону, членства — по паре (группа,
+    музыкант). Ошибочные строки попадают в отчёт и не останавливают импорт.
+    """
+    reader = csv.DictReader(f)
+    missing = [name for name in REQUIRED_COLUMNS if name not in (reader.fieldnames or ())]
+    if missing:
+        raise ValidationError(f"В файле нет столбцов: {', '.join(missing)}")
+
+    report, batch = ImportReport(), []
+    for raw in reader:
+        report.rows += 1
+        row, errors = clean_row(reader.line_num, raw)
+        if errors:
+            report.add_error(reader.line_num, errors)
+            continue
+        batch.append(row)
+        if len(batch) >= batch_size:
+            save_batch(batch, report, dry_run)
+            batch = []
+    if batch:
+        save_batch(batch, report, dry_run)
+
+    report.errors.sort(key=lambda error: error[0])
+    # bulk_create не отправляет сигналы моделей — версии таблиц поднимаем сами.
+    if report.imported and not dry_run:
+        bump_versions('musicians', 'bands', 'memberships')
+    return report
@@ -0,0 +1,61 @@
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Снимок структуры таблиц: {alias: {table_name: (column, ...)}}.
+# Заполняется один раз при старте (system check) или management-командой,
+# поэтому обработчики запросов никогда не обращаются к системному каталогу.
+_manifests = {}
+
+
+def expected_tables():
+    tables = {}
+    for model in apps.get_models():
+        if model._meta.proxy:
+            continue
+        tables.setdefault(model._meta.db_table, []).append(model)
+    return tables
+
+
+def load_manifest(using=DEFAULT_DB_ALIAS):
+    tables = sorted(expected_tables())
+    with connections[using].cursor() as cursor:
+        # pg_catalog, а не information_schema: там нет материализованных
+        # представлений, на которые тоже смотрят неуправляемые модели.
+        cursor.execute(
+            "SELECT c.relname, a.attname FROM pg_attribute a "
+            "JOIN pg_class c ON c.oid = a.attrelid "
+            "WHERE c.relnamespace = current_schema()::regnamespace "
+            "AND c.relname = ANY(%s) AND c.relkind IN ('r', 'p', 'v', 'm', 'f') "
+            "AND a.attnum > 0 AND NOT a.attisdropped "
+            "ORDER BY c.relname, a.attnum",
+            [tables],
+        )
+        rows = cursor.fetchall()
+
+    manifest = {}
+    for table_name, column_name in rows:
+        manifest.setdefault(table_name, []).append(column_name)
+    manifest = {table: tuple(columns) for table, columns in manifest.items()}
+    _manifests[using] = manifest
+    return manifest
+
+
+def get_manifest(using=DEFAULT_DB_ALIAS):
+    return _manifests.get(using)
+
+
+def find_drift(manifest):
+    drift = []
+    for table, models in sorted(expected_tables().items()):
+        columns = manifest.get(table)
+        for model in models:
+            if columns is None:
+                drift.append((model, table, None))
+                continue
+            missing = [
+                field.column for field in model._meta.concrete_fields
+                if field.column not in columns
+            ]
+            if missing:
+                drift.append((model, table, missing))
+    return drift
@@ -0,0 +1,169 @@
+import re
+from contextlib import contextmanager
+
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity,
+)
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast, Greatest
+
+SEARCH_CONFIGS = ('russian', 'english')
+# Порог pg_trgm для оператора <% (TrigramSearch).
+WORD_SIMILARITY_THRESHOLD = 0.5
+PREFIX_CONFIG = 'simple'
+MAX_TERMS = 8
+
+
+def concert_search_vector():
+    """
+    Выражение для сгенерированной колонки concerts.search_vector.
+
+    Название и адрес индексируются в русской и английской конфигурациях,
+    название весит больше адреса.
+    """
+    vector = None
+    for config in SEARCH_CONFIGS:
+        part = (
+            SearchVector('concert_title', config=config, weight='A')
+            + SearchVector('venue_address', config=config, weight='B')
+        )
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def search_terms(text):
+    return re.findall(r'\w+', text.lower())[:MAX_TERMS]
+
+
+def build_search_query(text):
+    """
+    Полнотекстовый запрос по обеим конфигурациям плюс запрос по префиксам
+    слов — для недописанного последнего слова при наборе.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return None
+    query = None
+    for config in SEARCH_CONFIGS:
+        part = SearchQuery(text, config=config, search_type='websearch')
+        query = part if query is None else query | part
+    prefix = ' & '.join(f'{term}:*' for term in terms)
+    return query | SearchQuery(prefix, config=PREFIX_CONFIG, search_type='raw')
+
+
+def search_concerts(queryset, text, vector_field='search_vector'):
+    """Отфильтровать концерты по тексту и отсортировать по релевантности."""
+    query = build_search_query(text)
+    if query is None:
+        return queryset
+    return (
+        queryset.filter(**{vector_field: query})
+        # double precision вместо real: значение ранга должно без потерь
+        # пройти через курсор пагинации и совпасть при сравнении в WHERE.
+        .annotate(search_rank=Cast(SearchRank(F(vector_field), query), FloatField()))
+        .order_by('-search_rank', '-concert_date', '-concert_id')
+    )
+
+
+@contextmanager
+def trigram_threshold(using=DEFAULT_DB_ALIAS):
+    """
+    Порог WORD_SIMILARITY_THRESHOLD для поиска TrigramSearch внутри блока.
+
+    SET LOCAL живёт до конца транзакции, поэтому запрос должен выполниться
+    внутри блока. Подключение не меняется — так порог работает и за пулером
+    соединений (PgBouncer в режиме transaction), и не достаётся чужим запросам.
+    """
+    with transaction.atomic(using=using):
+        with connections[using].cursor() as cursor:
+            cursor.execute('SET LOCAL pg_trgm.word_similarity_threshold = %s', [WORD_SIMILARITY_THRESHOLD])
+        yield
+
+
+class TrigramSearch:
+    """
+    Нечёткий поиск по триграммам (pg_trgm), устойчивый к опечаткам.
+
+    Совпадением считается слово, похожее на запрос не меньше порога
+    WORD_SIMILARITY_THRESHOLD, или начало значения одного из prefix_fields.
+    Оба условия обслуживаются индексами: GIN gin_trgm_ops и UPPER(field)
+    text_pattern_ops. Порог задаёт trigram_threshold — результат search
+    нужно выполнять внутри него.
+
+    Слова запроса, совпадающие с вариантом одного из choice_fields (по коду
+    или названию), дополнительно ищутся как точный фильтр по этому полю:
+    «bass Иванов» — басисты Ивановы или совпадение по всему запросу.
+    """
+
+    max_length = 100
+    min_choice_length = 3
+
+    def __init__(self, *fields, prefix_fields=None, choice_fields=()):
+        self.fields = fields
+        self.prefix_fields = fields if prefix_fields is None else prefix_fields
+        self.choice_fields = choice_fields
+
+    def clean(self, term):
+        return ' '.join(term.split())[:self.max_length]
+
+    def rank(self, term):
+        ranks = [TrigramWordSimilarity(term, field) for field in self.fields]
+        rank = ranks[0] if len(ranks) == 1 else Greatest(*ranks)
+        # real -> double precision, как в search_concerts: ранг участвует
+        # в курсоре пагинации списков и должен совпасть при сравнении.
+        return Cast(rank, FloatField())
+
+    def split_choices(self, model, term):
+        """Выделить из запроса слова-варианты choice_fields: (фильтры, остаток)."""
+        filters, words = {}, []
+        for word in term.split():
+            lowered = word.lower()
+            matched = False
+            if len(lowered) >= self.min_choice_length:
+                for field in self.choice_fields:
+                    values = [
+                        value for value, label in model._meta.get_field(field).flatchoices
+                        if value.lower().startswith(lowered) or str(label).lower().startswith(lowered)
+                    ]
+                    if values:
+                        filters.setdefault(f'{field}__in', []).extend(values)
+                        matched = True
+            if not matched:
+                words.append(word)
+        return filters, ' '.join(words)
+
+    def match(self, term):
+        condition = Q()
+        for field in self.prefix_fields:
+            condition |= Q(**{f'{field}__istartswith': term})
+        for field in self.fields:
+            condition |= Q(**{f'{field}__trigram_word_similar': term})
+        return condition
+
+    def search(self, queryset, term, ordering=()):
+        """Отфильтровать по запросу; лучшие совпадения идут первыми."""
+        term = self.clean(term)
+        if not term:
+            return queryset.order_by(*ordering) if ordering else queryset
+        condition, rank = self.match(term), self.rank(term)
+        if self.choice_fields:
+            filters, rest = self.split_choices(queryset.model, term)
+            if filters:
+                # «Cla» — и Clara, и кларнет: вариант расширяет поиск по
+                # имени, а не заменяет его.
+                choice_condition = Q(**filters)
+                if rest:
+                    choice_condition &= self.match(rest)
+                    rank = Greatest(rank, self.rank(rest))
+                condition |= choice_condition
+        return (
+            queryset.filter(condition)
+            .annotate(search_rank=rank)
+            .order_by('-search_rank', *ordering)
+        )
+
+
+BAND_SEARCH = TrigramSearch('band_name', 'genre', prefix_fields=('band_name',))
+MUSICIAN_SEARCH = TrigramSearch('last_name', 'first_name', choice_fields=('instrument',))
+CONCERT_SEARCH = TrigramSearch('concert_title', 'venue_address', prefix_fields=('concert_title',))
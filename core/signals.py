@@ -0,0 +1,36 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+
+from .images import logo_changed
+from .lineups import watch
+from .models import Band, BandMembership, Concert, Musician, Performance, Rehearsal
+from .versioning import bump_versions_on_commit
+
+TRACKED_TABLES = {}
+
+
+def bump_table_version(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    bump_versions_on_commit(TRACKED_TABLES[sender], using=using)
+
+
+def track(model, table):
+    """Поднимать версию таблицы table при каждом сохранении/удалении model."""
+    TRACKED_TABLES[model] = table
+    post_save.connect(bump_table_version, sender=model, dispatch_uid=f'version-save-{model._meta.label}')
+    post_delete.connect(bump_table_version, sender=model, dispatch_uid=f'version-delete-{model._meta.label}')
+
+
+track(Band, 'bands')
+track(BandMembership, 'memberships')
+track(Concert, 'concerts')
+track(Musician, 'musicians')
+track(Performance, 'performances')
+track(Rehearsal, 'rehearsals')
+
+# Составы предстоящих концертов в upcoming_lineups.
+watch(Band, fields=('band_name',))
+watch(Concert)
+watch(Performance)
+
+# Миниатюры логотипов групп.
+post_save.connect(logo_changed, sender=Band, dispatch_uid='logo-thumbnails')
@@ -0,0 +1,117 @@
+// Автодополнение для <select data-autocomplete-url>: вместо полного списка
+// опций показывает поле ввода и подгружает варианты порциями.
+(function () {
+    'use strict';
+
+    var PAGE_SIZE = 20;
+
+    function init(select) {
+        var wrapper = document.createElement('div');
+        wrapper.className = 'position-relative';
+        var input = document.createElement('input');
+        input.type = 'text';
+        input.className = 'form-control';
+        input.placeholder = 'Начните вводить для поиска';
+        input.autocomplete = 'off';
+        var selected = select.options[select.selectedIndex];
+        if (selected && selected.value) {
+            input.value = selected.text;
+        }
+        var list = document.createElement('div');
+        list.className = 'list-group position-absolute w-100 shadow-sm d-none';
+        list.style.zIndex = 1050;
+        list.style.maxHeight = '260px';
+        list.style.overflowY = 'auto';
+
+        select.parentNode.insertBefore(wrapper, select);
+        wrapper.appendChild(input);
+        wrapper.appendChild(list);
+        wrapper.appendChild(select);
+        select.classList.add('d-none');
+
+        var timer = null;
+        var offset = 0;
+        var more = false;
+        var loading = false;
+
+        function params() {
+            var query = new URLSearchParams({q: input.value, limit: PAGE_SIZE, offset: offset});
+            Object.keys(select.dataset).forEach(function (key) {
+                if (key.indexOf('autocomplete') === 0 && key !== 'autocompleteUrl') {
+                    var name = key.slice('autocomplete'.length);
+                    name = name.charAt(0).toLowerCase() + name.slice(1);
+                    query.set(name.replace(/[A-Z]/g, function (c) { return '_' + c.toLowerCase(); }), select.dataset[key]);
+                }
+            });
+            return query.toString();
+        }
+
+        function choose(id, text) {
+            var option = Array.prototype.find.call(select.options, function (o) { return o.value === String(id); });
+            if (!option) {
+                option = new Option(text, id);
+                select.add(option);
+            }
+            select.value = String(id);
+            input.value = text;
+            list.classList.add('d-none');
+            select.dispatchEvent(new Event('change', {bubbles: true}));
+        }
+
+        function load(append) {
+            if (loading) {
+                return;
+            }
+            loading = true;
+            fetch(select.dataset.autocompleteUrl + '?' + params(), {credentials: 'same-origin'})
+                .then(function (response) { return response.json(); })
+                .then(function (data) {
+                    if (!append) {
+                        list.innerHTML = '';
+                    }
+                    (data.results || []).forEach(function (item) {
+                        var button = document.createElement('button');
+                        button.type = 'button';
+                        button.className = 'list-group-item list-group-item-action';
+                        button.textContent = item.text;
+                        button.addEventListener('mousedown', function (event) {
+                            event.preventDefault();
+                            choose(item.id, item.text);
+                        });
+                        list.appendChild(button);
+                    });
+                    more = Boolean(data.more);
+                    offset += (data.results || []).length;
+                    list.classList.toggle('d-none', list.children.length === 0);
+                })
+                .finally(function () { loading = false; });
+        }
+
+        input.addEventListener('input', function () {
+            if (!input.value) {
+                select.value = '';
+            }
+            clearTimeout(timer);
+            timer = setTimeout(function () {
+                offset = 0;
+                load(false);
+            }, 200);
+        });
+        input.addEventListener('focus', function () {
+            offset = 0;
+            load(false);
+        });
+        input.addEventListener('blur', function () {
+            list.classList.add('d-none');
+        });
+        list.addEventListener('scroll', function () {
+            if (more && list.scrollTop + list.clientHeight >= list.scrollHeight - 20) {
+                load(true);
+            }
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('select[data-autocomplete-url]').forEach(init);
+    });
+})();
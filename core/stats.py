@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from django.db import connections, router
+
+from .models import Band, BandMembership, Concert, Musician, Performance, Rehearsal
+from .versioning import versions_stamp
+
+STATS_CACHE_TIMEOUT = 60 * 60
+# Начиная с этого размера (по pg_class.reltuples) COUNT(*) заменяется оценкой.
+EXACT_COUNT_LIMIT = 100_000
+
+# Имя счётчика совпадает с именем версии таблицы в core.signals.
+STATS_MODELS = {
+    'musicians': Musician,
+    'bands': Band,
+    'concerts': Concert,
+    'rehearsals': Rehearsal,
+    'memberships': BandMembership,
+    'performances': Performance,
+}
+
+
+def count_columns(table, quote_name):
+    """Столбцы (число строк, это оценка?) для одной таблицы."""
+    reltuples = '(SELECT reltuples FROM pg_class WHERE oid = %s::regclass)'
+    # Подзапросы без корреляции выполняются лениво: на большой таблице
+    # COUNT(*) не запускается вовсе, берётся оценка планировщика.
+    return [
+        f'CASE WHEN {reltuples} > %s THEN {reltuples}::bigint'
+        f' ELSE (SELECT COUNT(*) FROM {quote_name(table)}) END',
+        f'{reltuples} > %s',
+    ], [table, EXACT_COUNT_LIMIT, table, table, EXACT_COUNT_LIMIT]
+
+
+def collect_stats():
+    """Все счётчики и список жанров — одним запросом."""
+    using = router.db_for_read(Band)
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    bands = quote_name(Band._meta.db_table)
+
+    columns, params = [], []
+    for model in STATS_MODELS.values():
+        sql, sql_params = count_columns(model._meta.db_table, quote_name)
+        columns.extend(sql)
+        params.extend(sql_params)
+    columns.append(f'(SELECT array_agg(DISTINCT genre ORDER BY genre) FROM {bands})')
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT {", ".join(columns)}', params)
+        row = cursor.fetchone()
+
+    *pairs, genres = row
+    counts = dict(zip(STATS_MODELS, pairs[0::2]))
+    genres = genres or []
+    return {
+        'counts': counts,
+        'estimated': [name for name, estimated in zip(STATS_MODELS, pairs[1::2]) if estimated],
+        'genres': genres,
+        'total_genres': len(genres),
+    }
+
+
+def get_stats():
+    """
+    Статистика для боковой панели групп и дашборда.
+
+    Кэшируется под версиями таблиц, которые поднимают сигналы моделей:
+    любое изменение делает старую запись недостижимой.
+    """
+    key = f'stats:{versions_stamp(*STATS_MODELS)}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = collect_stats()
+        cache.set(key, stats, STATS_CACHE_TIMEOUT)
+    return stats
@@ -0,0 +1,18 @@
+import uuid
+
+from django import template
+from django.utils.html import format_html
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def idempotency_key_input(context):
+    request = context.get('request')
+    key = None
+    if request is not None and request.method == 'POST':
+        key = request.POST.get('idempotency_key')
+    return format_html(
+        '<input type="hidden" name="idempotency_key" value="{}">',
+        key or uuid.uuid4().hex,
+    )
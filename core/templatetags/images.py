@@ -0,0 +1,47 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+register = template.Library()
+
+
+def thumbnail_urls(band, fmt, size):
+    """srcset 1x/2x из миниатюр не меньше нужного размера."""
+    sizes = band.logo_thumbnails.get('sizes', {})
+    available = sorted(int(key) for key in sizes)
+    candidates = []
+    for density in (1, 2):
+        fitting = [key for key in available if key >= size * density]
+        if not fitting:
+            break
+        url = default_storage.url(sizes[str(fitting[0])][fmt])
+        candidates.append(f'{url} {density}x')
+    return ', '.join(candidates)
+
+
+def has_thumbnails(band):
+    return bool(band.logo) and band.logo_thumbnails.get('source') == band.logo.name
+
+
+@register.simple_tag
+def logo_picture(band, size, css_class='', style=''):
+    """
+    <picture> с WebP и запасным форматом для логотипа группы размером size px.
+
+    Пока миниатюры не построены, отдаётся оригинал.
+    """
+    if not band.logo:
+        return ''
+    fallback = thumbnail_urls(band, 'fallback', size) if has_thumbnails(band) else ''
+    if not fallback:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" style="{}" width="{}" height="{}" loading="lazy">',
+            band.logo.url, band.band_name, css_class, style, size, size,
+        )
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}">'
+        '<img src="{}" srcset="{}" alt="{}" class="{}" style="{}" width="{}" height="{}"'
+        ' loading="lazy" decoding="async"></picture>',
+        thumbnail_urls(band, 'webp', size),
+        fallback.split(' ')[0], fallback, band.band_name, css_class, style, size, size,
+    )
@@ -0,0 +1,59 @@
+import json
+import unittest
+
+from django.core.cache import caches
+from django.db import connection
+from django.test.runner import DiscoverRunner
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', ()):
+        yield from plan_nodes(child)
+
+
+class ExplainAssertionsMixin:
+    """
+    Проверки плана запроса через EXPLAIN для TestCase.
+
+    В тестовой базе таблицы крошечные, и планировщик честно выбирает
+    seq scan. Поэтому на время EXPLAIN последовательное сканирование
+    отключается: если индекс подходит к условию, план его покажет.
+    """
+
+    def explain(self, queryset):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        try:
+            return json.loads(queryset.explain(format='json'))[0]['Plan']
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('RESET enable_seqscan')
+
+    def assertUsesIndex(self, queryset, index_name):
+        nodes = list(plan_nodes(self.explain(queryset)))
+        used = {node.get('Index Name') for node in nodes} - {None}
+        self.assertIn(index_name, used, f'План не использует {index_name}: {[node["Node Type"] for node in nodes]}')
+
+    def assertNoSeqScan(self, queryset):
+        nodes = list(plan_nodes(self.explain(queryset)))
+        scans = [node['Relation Name'] for node in nodes if node['Node Type'] == 'Seq Scan']
+        self.assertEqual(scans, [], 'В плане есть последовательное сканирование')
+
+
+class CacheClearingResult(unittest.TextTestResult):
+    def startTest(self, test):
+        for cache in caches.all(initialized_only=True):
+            cache.clear()
+        super().startTest(test)
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Каждый тест начинается с пустых кэшей. Версии таблиц поднимаются после
+    коммита, а TestCase его не делает: без очистки тест получил бы страницы
+    и статистику, закэшированные предыдущим тестом под теми же версиями.
+    """
+
+    def get_resultclass(self):
+        return super().get_resultclass() or CacheClearingResult
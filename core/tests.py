@@ -0,0 +1,411 @@
+import io
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.dates import day_range, filter_day_range, local_tz
+from core.models import Band, BandMembership, Concert, Musician, Rehearsal
+from PIL import Image
+
+from core.images import THUMBNAIL_SIZES, update_band_thumbnails
+from core.roster import ImportReport, RosterRow, create_bands, import_roster, resolve_bands
+from core.search import BAND_SEARCH, WORD_SIMILARITY_THRESHOLD, trigram_threshold
+from core.stats import get_stats
+from core.testing import ExplainAssertionsMixin
+from core.versioning import table_versions
+from groups.forms import AddMemberForm
+
+User = get_user_model()
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        for name in ('Alpha', 'Alphaville', 'Beta', 'alpine'):
+            Band.objects.create(band_name=name, genre='rock')
+        self.url = reverse('core:autocomplete', args=['bands'])
+
+    def test_prefix_search_with_paging(self):
+        response = self.client.get(self.url, {'q': 'alp', 'limit': 2})
+        data = response.json()
+        self.assertEqual([r['text'] for r in data['results']], ['Alpha', 'Alphaville'])
+        self.assertTrue(data['more'])
+
+        data = self.client.get(self.url, {'q': 'alp', 'limit': 2, 'offset': 2}).json()
+        self.assertEqual([r['text'] for r in data['results']], ['alpine'])
+        self.assertFalse(data['more'])
+
+    def test_unknown_source(self):
+        response = self.client.get(reverse('core:autocomplete', args=['nothing']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_musicians_staff_only_and_exclude_band(self):
+        band = Band.objects.get(band_name='Beta')
+        member = Musician.objects.create(first_name='Ann', last_name='Lee', phone='+375291111111', instrument='bass')
+        Musician.objects.create(first_name='Bob', last_name='Lewis', phone='+375292222222', instrument='drums')
+        BandMembership.objects.create(band=band, musician=member)
+        url = reverse('core:autocomplete', args=['musicians'])
+
+        self.assertEqual(self.client.get(url, {'q': 'le'}).status_code, 403)
+
+        User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        data = self.client.get(url, {'q': 'le', 'exclude_band': band.pk}).json()
+        self.assertEqual([r['text'] for r in data['results']], ['Bob Lewis (drums)'])
+
+    def test_musician_picker_uses_not_exists_and_instrument_words(self):
+        band = Band.objects.get(band_name='Beta')
+        member = Musician.objects.create(first_name='Ann', last_name='Lee', phone='+375291111111', instrument='bass')
+        Musician.objects.create(first_name='Bob', last_name='Lewis', phone='+375292222222', instrument='drums')
+        Musician.objects.create(first_name='Carl', last_name='Lenz', phone='+375293333333', instrument='bass')
+        BandMembership.objects.create(band=band, musician=member)
+
+        form = AddMemberForm(band=band)
+        self.assertIn('NOT EXISTS', str(form.fields['musician'].queryset.query))
+
+        form = AddMemberForm({'musician': member.pk, 'join_date': '2024-01-01'}, band=band)
+        self.assertEqual(form.errors['musician'], ['Этот музыкант уже состоит в группе'])
+        form = AddMemberForm({'musician': 999999, 'join_date': '2024-01-01'}, band=band)
+        self.assertNotEqual(form.errors['musician'], ['Этот музыкант уже состоит в группе'])
+
+        User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        url = reverse('core:autocomplete', args=['musicians'])
+        data = self.client.get(url, {'q': 'bass le', 'exclude_band': band.pk}).json()
+        self.assertEqual([r['text'] for r in data['results']], ['Carl Lenz (bass)'])
+        data = self.client.get(url, {'q': 'Drum'}).json()
+        self.assertEqual([r['text'] for r in data['results']], ['Bob Lewis (drums)'])
+
+    def test_instrument_prefix_still_matches_names(self):
+        Musician.objects.create(first_name='Clara', last_name='Voss', phone='+375294444444', instrument='drums')
+        Musician.objects.create(first_name='Dan', last_name='Reed', phone='+375295555555', instrument='clarinet')
+        User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        data = self.client.get(reverse('core:autocomplete', args=['musicians']), {'q': 'Cla'}).json()
+        self.assertEqual([r['text'] for r in data['results']], ['Clara Voss (drums)', 'Dan Reed (clarinet)'])
+
+    def test_select_renders_only_selected_option(self):
+        band = Band.objects.get(band_name='Beta')
+        musician = Musician.objects.create(first_name='Ann', last_name='Lee', phone='+375291111111', instrument='bass')
+        Musician.objects.create(first_name='Bob', last_name='Lewis', phone='+375292222222', instrument='drums')
+
+        html = str(AddMemberForm(band=band)['musician'])
+        self.assertNotIn('Lewis', html)
+        self.assertIn('data-autocomplete-exclude-band', html)
+
+        html = str(AddMemberForm({'musician': musician.pk}, band=band)['musician'])
+        self.assertIn('Ann Lee', html)
+        self.assertNotIn('Lewis', html)
+
+
+class TrigramSearchTests(TestCase):
+    def setUp(self):
+        for name, genre in (('Metallica', 'heavy metal'), ('Megadeth', 'thrash'), ('Beatles', 'rock')):
+            Band.objects.create(band_name=name, genre=genre)
+
+    def names(self, term):
+        with trigram_threshold():
+            return [band.band_name for band in BAND_SEARCH.search(Band.objects.all(), term, ('band_name',))]
+
+    def test_threshold_is_set_locally_in_the_block(self):
+        with trigram_threshold():
+            with connection.cursor() as cursor:
+                cursor.execute('SHOW pg_trgm.word_similarity_threshold')
+                self.assertEqual(float(cursor.fetchone()[0]), WORD_SIMILARITY_THRESHOLD)
+
+    def test_typo_is_tolerated(self):
+        self.assertEqual(self.names('Metalica'), ['Metallica'])
+        self.assertEqual(self.names('beatels'), ['Beatles'])
+
+    def test_prefix_and_genre_match_ranked(self):
+        self.assertEqual(self.names('me'), ['Megadeth', 'Metallica'])
+        self.assertEqual(self.names('trash'), ['Megadeth'])
+
+    def test_empty_term_keeps_everything(self):
+        self.assertEqual(self.names('  '), ['Beatles', 'Megadeth', 'Metallica'])
+
+    def test_groups_page_and_admin_list_use_the_service(self):
+        User.objects.create_user(username='staff', password='password', is_staff=True)
+        self.client.login(username='staff', password='password')
+
+        response = self.client.get(reverse('groups:band_list'), {'search': 'Metalica'})
+        self.assertEqual([band.band_name for band in response.context['bands']], ['Metallica'])
+
+        response = self.client.get(reverse('custom_admin:band_list'), {'search': 'Megadet'})
+        self.assertEqual([band.band_name for band in response.context['bands']], ['Megadeth'])
+
+
+class DateRangeIndexTests(ExplainAssertionsMixin, TestCase):
+    def test_day_range_is_half_open_in_local_time(self):
+        start, end = day_range(date(2026, 3, 1), date(2026, 3, 1))
+        self.assertEqual(timezone.localtime(start, local_tz()).isoformat(), '2026-03-01T00:00:00+03:00')
+        self.assertEqual(end - start, timedelta(days=1))
+
+    def test_concert_filter_uses_date_index(self):
+        queryset = filter_day_range(Concert.objects.all(), 'concert_date', '2026-03-01', '2026-03-31')
+        self.assertNotIn('AT TIME ZONE', str(queryset.query))
+        self.assertUsesIndex(queryset, 'concerts_date_id_idx')
+
+    def test_rehearsal_filter_uses_date_index(self):
+        queryset = filter_day_range(Rehearsal.objects.all(), 'rehearsal_date', date(2026, 3, 1), None)
+        self.assertUsesIndex(queryset.order_by('rehearsal_date', 'rehearsal_id'), 'rehearsals_date_id_idx')
+
+    def test_invalid_date_is_ignored(self):
+        queryset = filter_day_range(Concert.objects.all(), 'concert_date', 'not-a-date', '')
+        self.assertNotIn('WHERE', str(queryset.query))
+
+    def test_archive_filter_includes_whole_last_day(self):
+        late = timezone.make_aware(datetime(2026, 3, 31, 23, 30), local_tz())
+        Concert.objects.create(concert_title="Late show", venue_address="Minsk", concert_date=late)
+        response = self.client.get(reverse('concertsshower:all_concerts'), {'from_date': '2026-03-31', 'to_date': '2026-03-31'})
+        self.assertEqual([concert.concert_title for concert in response.context['concerts']], ['Late show'])
+
+
+class StatsTests(TestCase):
+    def setUp(self):
+        Band.objects.create(band_name='Alpha', genre='rock')
+        Band.objects.create(band_name='Beta', genre='jazz')
+        Musician.objects.create(first_name='Ivan', last_name='Ivanov', phone='+375291000001', instrument='bass')
+
+    def test_stats_are_collected_in_one_query_and_cached(self):
+        with CaptureQueriesContext(connection) as ctx:
+            stats = get_stats()
+        self.assertEqual(len([q for q in ctx.captured_queries if 'pg_class' in q['sql']]), 1)
+        self.assertEqual(stats['counts']['bands'], 2)
+        self.assertEqual(stats['counts']['musicians'], 1)
+        self.assertEqual(stats['genres'], ['jazz', 'rock'])
+
+        with CaptureQueriesContext(connection) as ctx:
+            get_stats()
+        self.assertFalse([q for q in ctx.captured_queries if 'pg_class' in q['sql']])
+
+    def test_model_change_invalidates_stats(self):
+        get_stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            Band.objects.create(band_name='Gamma', genre='folk')
+        stats = get_stats()
+        self.assertEqual(stats['counts']['bands'], 3)
+        self.assertEqual(stats['total_genres'], 3)
+
+    def test_version_is_bumped_after_commit(self):
+        before = table_versions('bands')['bands']
+        with self.captureOnCommitCallbacks() as callbacks:
+            Band.objects.create(band_name='Gamma', genre='folk')
+        self.assertEqual(table_versions('bands')['bands'], before)
+        callbacks[0]()
+        self.assertGreater(table_versions('bands')['bands'], before)
+
+    def test_large_table_uses_planner_estimate(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE bands')
+        with mock.patch('core.stats.EXACT_COUNT_LIMIT', 1):
+            stats = get_stats()
+        self.assertIn('bands', stats['estimated'])
+        self.assertNotIn('musicians', stats['estimated'])
+
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(prefix='encore_core_media_')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, LOGO_THUMBNAILS_ASYNC=False)
+class LogoThumbnailTests(TestCase):
+    def tearDown(self):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def upload(self, name='logo.jpg'):
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        buffer = io.BytesIO()
+        Image.new('RGB', (600, 400), 'red').save(buffer, 'JPEG', exif=exif)
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+    def create_band(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            band = Band.objects.create(band_name='Pixels', genre='rock', logo=self.upload())
+        band.refresh_from_db()
+        return band
+
+    def test_thumbnails_are_built_after_commit(self):
+        band = self.create_band()
+        self.assertEqual(band.logo_thumbnails['source'], band.logo.name)
+        self.assertEqual(sorted(map(int, band.logo_thumbnails['sizes'])), sorted(THUMBNAIL_SIZES))
+
+        variant = band.logo_thumbnails['sizes']['64']
+        self.assertTrue(variant['webp'].endswith('-64.webp'))
+        with default_storage.open(variant['fallback']) as f:
+            image = Image.open(f)
+            self.assertEqual(image.size, (64, 64))
+            self.assertFalse(image.getexif())
+
+    def test_thumbnails_update_bumps_bands_version(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            band = Band.objects.create(band_name='Pixels', genre='rock')
+        before = table_versions('bands')['bands']
+        # Логотип без сигналов: миниатюры строятся ниже, вручную.
+        band.logo.save('logo.jpg', self.upload(), save=False)
+        Band.objects.filter(pk=band.pk).update(logo=band.logo.name)
+        update_band_thumbnails(band.pk)
+        band.refresh_from_db()
+        self.assertTrue(band.logo_thumbnails)
+        self.assertGreater(table_versions('bands')['bands'], before)
+
+    def test_same_content_gets_same_names(self):
+        first = self.create_band()
+        second = self.create_band()
+        self.assertNotEqual(first.logo.name, second.logo.name)
+        self.assertEqual(first.logo_thumbnails['sizes'], second.logo_thumbnails['sizes'])
+
+    def test_logo_picture_uses_thumbnails(self):
+        band = self.create_band()
+        html = Template('{% load images %}{% logo_picture band 50 %}').render(Context({'band': band}))
+        sizes = band.logo_thumbnails['sizes']
+        self.assertIn('type="image/webp"', html)
+        self.assertIn(f"{default_storage.url(sizes['128']['webp'])} 2x", html)
+        self.assertNotIn(band.logo.url, html)
+
+    def test_logo_picture_falls_back_to_original(self):
+        band = Band(band_name='Pending', genre='rock', logo='band_logos/pending.png')
+        html = Template('{% load images %}{% logo_picture band 50 %}').render(Context({'band': band}))
+        self.assertIn(band.logo.url, html)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaServingTests(TestCase):
+    def setUp(self):
+        self.name = default_storage.save('band_logos/thumbs/0123456789abcdef-64.webp', io.BytesIO(b'0123456789'))
+        self.url = f'/media/{self.name}'
+
+    def tearDown(self):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_full_file_with_cache_headers(self):
+        response = self.client.get(self.url)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Content-Type'], 'image/webp')
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-3')
+        self.assertEqual(b''.join(response.streaming_content), b'789')
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=20-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_stale_if_range_returns_whole_file(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_conditional_request(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_plain_name_gets_short_cache(self):
+        name = default_storage.save('band_logos/logo.png', io.BytesIO(b'png'))
+        self.assertNotIn('immutable', self.client.get(f'/media/{name}')['Cache-Control'])
+
+    @override_settings(MEDIA_SENDFILE='x-accel-redirect')
+    def test_offloads_to_web_server(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.name}')
+        self.assertEqual(response.content, b'')
+
+    def test_paths_outside_media_root_are_rejected(self):
+        self.assertEqual(self.client.get('/media/../config/settings.py').status_code, 404)
+        self.assertEqual(self.client.get('/media/band_logos/missing.png').status_code, 404)
+
+
+ROSTER_CSV = """first_name,last_name,phone,telegram,instrument,band_name,genre,join_date
+Ann,Lee,+375291000001,@ann,bass,Northern Lights,rock,2024-01-10
+Bob,Ray,+375291000002,,drums,Northern Lights,,
+Cid,Moe,375291000003,,drums,,,
+Dan,Fox,+375291000004,dan,harmonica,,,
+Eve,Kim,+375291000005,,vocals,Nowhere,,
+Ann,Lee,+375291000001,@ann_lee,bass,Jazz Trio,jazz,2024-02-01
+"""
+
+
+class RosterImportTests(TestCase):
+    def import_csv(self, text=ROSTER_CSV, **kwargs):
+        return import_roster(io.StringIO(text), **kwargs)
+
+    def test_valid_rows_are_imported_and_errors_reported(self):
+        report = self.import_csv(batch_size=2)
+        self.assertEqual((report.rows, report.imported), (6, 3))
+        self.assertEqual([line for line, _ in report.errors], [4, 5, 6])
+        self.assertTrue(report.errors[0][1][0].startswith('phone:'))
+        self.assertTrue(any(m.startswith('telegram:') for m in report.errors[1][1]))
+        self.assertTrue(any(m.startswith('instrument:') for m in report.errors[1][1]))
+
+        ann = Musician.objects.get(phone='+375291000001')
+        self.assertEqual(ann.telegram, '@ann_lee')
+        self.assertEqual(
+            sorted(ann.bandmembership_set.values_list('band__band_name', flat=True)),
+            ['Jazz Trio', 'Northern Lights'],
+        )
+        self.assertEqual(Band.objects.get(band_name='Northern Lights').member_count, 2)
+        self.assertFalse(Band.objects.filter(band_name='Nowhere').exists())
+
+    def test_reimport_updates_instead_of_duplicating(self):
+        self.import_csv()
+        report = self.import_csv(ROSTER_CSV.replace('Bob,Ray', 'Bob,Roy'))
+        self.assertEqual(report.imported, 3)
+        self.assertEqual(Musician.objects.count(), 2)
+        self.assertEqual(BandMembership.objects.count(), 3)
+        self.assertEqual(Musician.objects.get(phone='+375291000002').last_name, 'Roy')
+
+    def test_default_join_date_after_local_midnight(self):
+        # 22:30 UTC — в Минске уже следующие сутки.
+        late_evening = datetime(2030, 6, 1, 22, 30, tzinfo=dt_timezone.utc)
+        text = 'first_name,last_name,phone,instrument,band_name,genre\nAnn,Lee,+375291000001,bass,Night Owls,rock\n'
+        with mock.patch('django.utils.timezone.now', return_value=late_evening):
+            report = self.import_csv(text)
+        self.assertEqual(report.errors, [])
+        self.assertEqual(BandMembership.objects.get().join_date, date(2030, 6, 2))
+
+    def test_row_rejected_by_database_does_not_fail_the_batch(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ALTER TABLE musicians ADD CONSTRAINT test_no_zed CHECK (first_name <> 'Zed')")
+        text = (
+            'first_name,last_name,phone,instrument,band_name,genre\n'
+            'Ann,Lee,+375291000001,bass,Night Owls,rock\n'
+            'Zed,Moe,+375291000002,drums,Night Owls,rock\n'
+            'Bob,Ray,+375291000003,drums,Night Owls,rock\n'
+        )
+        report = self.import_csv(text)
+        self.assertEqual(report.imported, 2)
+        self.assertEqual([line for line, _ in report.errors], [3])
+        self.assertEqual(sorted(Musician.objects.values_list('first_name', flat=True)), ['Ann', 'Bob'])
+        self.assertEqual(Band.objects.get(band_name='Night Owls').member_count, 2)
+
+    def test_band_created_by_concurrent_import_is_reused(self):
+        bands, new_bands, _ = resolve_bands([RosterRow(2, {}, 'Night Owls', 'rock')], ImportReport())
+        band = Band.objects.create(band_name='Night Owls', genre='rock')
+        create_bands(new_bands, bands)
+        self.assertEqual(bands, {'Night Owls': band.pk})
+        self.assertEqual(Band.objects.filter(band_name='Night Owls').count(), 1)
+
+    def test_dry_run_saves_nothing(self):
+        report = self.import_csv(dry_run=True)
+        self.assertEqual(report.imported, 3)
+        self.assertFalse(Musician.objects.exists())
+
+    def test_missing_columns(self):
+        with self.assertRaises(ValidationError):
+            self.import_csv('first_name,last_name\nAnn,Lee\n')
@@ -0,0 +1,56 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .caches import state_cache
+
+
+def version_key(name):
+    return f'version:{name}'
+
+
+def table_versions(*names):
+    """
+    Версии таблиц — время последнего изменения (unix time).
+
+    Версия хранится в общем кэше и обновляется сигналами моделей.
+    Если ключа нет (кэш очищен), версия начинается с текущего момента.
+    """
+    keys = {version_key(name): name for name in names}
+    versions = {keys[key]: value for key, value in state_cache.get_many(keys).items()}
+    missing = [name for name in names if name not in versions]
+    if missing:
+        now = time.time()
+        for name in missing:
+            state_cache.add(version_key(name), now, None)
+            versions[name] = now
+    return versions
+
+
+def bump_versions(*names):
+    now = time.time()
+    state_cache.set_many({version_key(name): now for name in names}, None)
+
+
+def bump_versions_on_commit(*names, using=DEFAULT_DB_ALIAS):
+    """
+    Поднять версии после коммита. Если поднять раньше, параллельный запрос
+    успеет закэшировать страницу со старыми данными под новой версией,
+    а при откате версия сменится без изменений.
+    """
+    transaction.on_commit(lambda: bump_versions(*names), using=using)
+
+
+def versions_stamp(*names):
+    versions = table_versions(*names)
+    return '-'.join(f'{versions[name]:.6f}' for name in names)
+
+
+def versions_etag(prefix, *names, extra=''):
+    return f'{prefix}-{extra}-{versions_stamp(*names)}'
+
+
+def versions_last_modified(*names):
+    versions = table_versions(*names)
+    return datetime.fromtimestamp(max(versions.values()), tz=dt_timezone.utc)
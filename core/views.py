@@ -0,0 +1,32 @@
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET
+
+from .autocomplete import AUTOCOMPLETE_MAX_LIMIT, AUTOCOMPLETE_SOURCES
+
+
+def int_param(request, name, default, maximum=None):
+    try:
+        value = max(int(request.GET.get(name, default)), 0)
+    except ValueError:
+        value = default
+    return min(value, maximum) if maximum is not None else value
+
+
+@require_GET
+def autocomplete(request, source):
+    source = AUTOCOMPLETE_SOURCES.get(source)
+    if source is None:
+        raise Http404
+    if source.staff_only and not request.user.is_staff:
+        return JsonResponse({'error': 'forbidden'}, status=403)
+
+    results, more = source.search(
+        request.GET.get('q', ''),
+        limit=int_param(request, 'limit', 20, AUTOCOMPLETE_MAX_LIMIT) or 20,
+        offset=int_param(request, 'offset', 0),
+        params=request.GET,
+    )
+    return JsonResponse({
+        'results': [{'id': pk, 'text': text} for pk, text in results],
+        'more': more,
+    })
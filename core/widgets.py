@@ -0,0 +1,38 @@
+from django import forms
+from django.urls import reverse_lazy
+
+
+class AutocompleteSelect(forms.Select):
+    """
+    Select, который рендерит только выбранный вариант.
+
+    Остальные варианты подгружаются скриптом core/autocomplete.js
+    с эндпоинта автодополнения, поэтому страница формы не зависит
+    от размера таблицы.
+    """
+
+    def __init__(self, source, attrs=None, params=None):
+        attrs = {'class': 'form-control', **(attrs or {})}
+        super().__init__(attrs=attrs)
+        self.source = source
+        self.params = params or {}
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        widget_attrs = context['widget']['attrs']
+        widget_attrs['data-autocomplete-url'] = str(reverse_lazy('core:autocomplete', args=[self.source]))
+        for key, param in self.params.items():
+            widget_attrs[f'data-autocomplete-{key}'] = param
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        selected = [v for v in value if str(v).isdigit()]
+        options = [self.create_option(name, '', '---------', not selected, 0)]
+        queryset = getattr(self.choices, 'queryset', None)
+        if selected and queryset is not None:
+            field = self.choices.field
+            for index, obj in enumerate(queryset.filter(pk__in=selected), start=1):
+                options.append(self.create_option(
+                    name, field.prepare_value(obj), field.label_from_instance(obj), True, index, attrs=attrs
+                ))
+        return [(None, options, 0)]
@@ -2,6 +2,7 @@ from django import forms
 from django.utils import timezone
 from core.models import Rehearsal, Performance
 from core.forms import MusicianForm, BandForm, ConcertForm, BandMembershipForm
+from core.widgets import AutocompleteSelect
 
 
 class RehearsalForm(forms.ModelForm):
@@ -22,7 +23,7 @@ class RehearsalForm(forms.ModelForm):
                 'class': 'form-control',
                 'placeholder': 'Введите место проведения'
             }),
-            'band': forms.Select(attrs={'class': 'form-control'})
+            'band': AutocompleteSelect('bands')
         }
     
     def clean_rehearsal_date(self):
@@ -45,8 +46,8 @@ class PerformanceForm(forms.ModelForm):
         model = Performance
         fields = ['concert', 'band', 'performance_order']
         widgets = {
-            'concert': forms.Select(attrs={'class': 'form-control'}),
-            'band': forms.Select(attrs={'class': 'form-control'}),
+            'concert': AutocompleteSelect('concerts'),
+            'band': AutocompleteSelect('bands'),
             'performance_order': forms.NumberInput(attrs={
                 'class': 'form-control',
                 'min': 1
@@ -75,7 +76,19 @@ class PerformanceForm(forms.ModelForm):
         return order
 
 
+class RosterImportForm(forms.Form):
+    file = forms.FileField(
+        label='CSV-файл',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv'})
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        label='Только проверить, ничего не сохранять',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+
+
 __all__ = [
     'MusicianForm', 'BandForm', 'ConcertForm', 'BandMembershipForm',
-    'RehearsalForm', 'PerformanceForm'
-]
\ No newline at end of file
+    'RehearsalForm', 'PerformanceForm', 'RosterImportForm'
+]
@@ -0,0 +1,192 @@
+from contextlib import nullcontext
+
+from django.db.models import F
+from django.utils.dateparse import parse_date
+
+from core.dates import filter_day_range
+from core.models import Band, BandMembership, Concert, Musician, Performance, Rehearsal
+from core.pagination import KeysetPaginator
+from core.search import BAND_SEARCH, CONCERT_SEARCH, MUSICIAN_SEARCH, trigram_threshold
+
+
+class ChoiceFilter:
+    """Фильтр по столбцу с вариантами (инструмент, жанр)."""
+
+    kind = 'choice'
+
+    def __init__(self, name, label, field, choices):
+        self.name = name
+        self.label = label
+        self.field = field
+        self.choices = choices
+
+    def value(self, params):
+        value = params.get(self.name, '')
+        return value if value in dict(self.choices) else ''
+
+    def apply(self, queryset, params):
+        value = self.value(params)
+        return queryset.filter(**{self.field: value}) if value else queryset
+
+    def bind(self, params):
+        return {'filter': self, 'value': self.value(params)}
+
+
+class DateRangeFilter:
+    """
+    Фильтр «с — по» (включительно). Для DateTimeField — полуоткрытый
+    интервал местных суток (core.dates), для DateField — даты как есть.
+    """
+
+    kind = 'date_range'
+
+    def __init__(self, name, label, field, datetime=True):
+        self.name = name
+        self.label = label
+        self.field = field
+        self.datetime = datetime
+
+    def values(self, params):
+        values = []
+        for suffix in ('from', 'to'):
+            try:
+                values.append(parse_date(params.get(f'{self.name}_{suffix}', '')))
+            except ValueError:
+                values.append(None)
+        return values
+
+    def apply(self, queryset, params):
+        date_from, date_to = self.values(params)
+        if self.datetime:
+            return filter_day_range(queryset, self.field, date_from, date_to)
+        if date_from:
+            queryset = queryset.filter(**{f'{self.field}__gte': date_from})
+        if date_to:
+            queryset = queryset.filter(**{f'{self.field}__lte': date_to})
+        return queryset
+
+    def bind(self, params):
+        date_from, date_to = self.values(params)
+        return {'filter': self, 'date_from': date_from, 'date_to': date_to}
+
+
+class AdminList:
+    """
+    Список административной панели: фильтры, поиск, сортировка из белого
+    списка и keyset-пагинация по per_page строк.
+
+    sorts — {ключ: (подпись, ordering)}, первый ключ — сортировка по
+    умолчанию. Каждый ordering заканчивается ключом и должен иметь индекс:
+    тогда время ответа не зависит ни от размера таблицы, ни от страницы.
+    """
+
+    def __init__(self, queryset, sorts, per_page, filters=(), search=None):
+        self.queryset = queryset
+        self.sorts = sorts
+        self.per_page = per_page
+        self.filters = filters
+        self.search = search
+
+    def sort_key(self, params):
+        key = params.get('sort', '')
+        return key if key in self.sorts else next(iter(self.sorts))
+
+    def get_context(self, request):
+        params = request.GET
+        queryset = self.queryset.all()
+        for list_filter in self.filters:
+            queryset = list_filter.apply(queryset, params)
+
+        sort = self.sort_key(params)
+        ordering = tuple(self.sorts[sort][1])
+        search_query = params.get('search', '').strip()
+        searching = self.search is not None and bool(search_query)
+        if searching:
+            queryset = self.search.search(queryset, search_query, ordering)
+            if 'search_rank' in queryset.query.annotations:
+                ordering = ('-search_rank',) + ordering
+
+        with trigram_threshold() if searching else nullcontext():
+            page = KeysetPaginator(queryset, ordering, self.per_page).get_page(params.get('cursor'))
+        return {
+            'page_obj': page,
+            'search_query': search_query,
+            'searchable': self.search is not None,
+            'sort': sort,
+            'sorts': [(key, label) for key, (label, _) in self.sorts.items()],
+            'filters': [list_filter.bind(params) for list_filter in self.filters],
+        }
+
+
+MUSICIAN_LIST = AdminList(
+    Musician.objects.all(),
+    sorts={
+        'name': ('По фамилии', ('last_name', 'first_name', 'musician_id')),
+        'new': ('Сначала новые', ('-musician_id',)),
+    },
+    per_page=50,
+    filters=[ChoiceFilter('instrument', 'Инструмент', 'instrument', Musician.INSTRUMENT_CHOICES)],
+    search=MUSICIAN_SEARCH,
+)
+
+BAND_LIST = AdminList(
+    Band.objects.all(),
+    sorts={
+        'name': ('По названию', ('band_name', 'band_id')),
+        'size': ('По числу участников', ('-member_count', 'band_id')),
+        'new': ('Сначала новые', ('-band_id',)),
+    },
+    per_page=50,
+    filters=[ChoiceFilter('genre', 'Жанр', 'genre', Band.GENRE_CHOICES)],
+    search=BAND_SEARCH,
+)
+
+CONCERT_LIST = AdminList(
+    Concert.objects.all(),
+    sorts={
+        'date_desc': ('Сначала поздние', ('-concert_date', '-concert_id')),
+        'date': ('Сначала ранние', ('concert_date', 'concert_id')),
+    },
+    per_page=30,
+    filters=[DateRangeFilter('date', 'Дата', 'concert_date')],
+    search=CONCERT_SEARCH,
+)
+
+REHEARSAL_LIST = AdminList(
+    Rehearsal.objects.select_related('band'),
+    sorts={
+        'date_desc': ('Сначала поздние', ('-rehearsal_date', '-rehearsal_id')),
+        'date': ('Сначала ранние', ('rehearsal_date', 'rehearsal_id')),
+    },
+    per_page=50,
+    filters=[DateRangeFilter('date', 'Дата', 'rehearsal_date')],
+)
+
+MEMBERSHIP_LIST = AdminList(
+    BandMembership.objects.select_related('musician', 'band'),
+    sorts={
+        'joined_desc': ('Сначала новые', ('-join_date', '-id')),
+        'joined': ('Сначала старые', ('join_date', 'id')),
+    },
+    per_page=100,
+    filters=[
+        ChoiceFilter('instrument', 'Инструмент', 'musician__instrument', Musician.INSTRUMENT_CHOICES),
+        DateRangeFilter('joined', 'Дата вступления', 'join_date', datetime=False),
+    ],
+)
+
+# Дата концерта — аннотация: по ней сортирует и строит курсор KeysetPaginator;
+# concert_id разводит концерты в одно время. Концерты идут по порядку
+# concerts_date_id_idx, к каждому — его выступления по performances_concert_idx,
+# так что досортировать остаётся только выступления внутри концерта.
+PERFORMANCE_LIST = AdminList(
+    Performance.objects.select_related('concert', 'band').annotate(concert_date=F('concert__concert_date')),
+    sorts={
+        'concert': ('По дате концерта', ('concert_date', 'concert_id', 'performance_order', 'performance_id')),
+        'concert_desc': (
+            'Сначала поздние концерты', ('-concert_date', '-concert_id', 'performance_order', 'performance_id'),
+        ),
+    },
+    per_page=50,
+    filters=[DateRangeFilter('date', 'Дата концерта', 'concert__concert_date')],
+)
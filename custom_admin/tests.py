@@ -1,10 +1,14 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, RequestFactory
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
 from django.core.files.uploadedfile import SimpleUploadedFile
 
+from core.caches import state_cache
+from core.idempotency import PENDING, idempotency_cache_key, request_owner
 from core.models import Musician, Band, Concert, Rehearsal, Performance, BandMembership
+from core.testing import ExplainAssertionsMixin
+from custom_admin.lists import PERFORMANCE_LIST
 
 User = get_user_model()
 
@@ -152,6 +156,41 @@ class MusicianViewsTests(TestCase):
             last_name='Иванова'
         ).exists())
 
+    def test_musician_create_replay_is_idempotent(self):
+        new_musician = {
+            'first_name': 'Мария',
+            'last_name': 'Иванова',
+            'phone': '+375293456789',
+            'instrument': 'piano',
+            'idempotency_key': 'replayed-key'
+        }
+        url = reverse('custom_admin:musician_create')
+        first = self.client.post(url, new_musician)
+        second = self.client.post(url, new_musician)
+
+        self.assertRedirects(first, reverse('custom_admin:musician_list'))
+        self.assertRedirects(second, reverse('custom_admin:musician_list'))
+        self.assertEqual(Musician.objects.filter(phone='+375293456789').count(), 1)
+
+    def test_idempotency_key_is_scoped_to_user(self):
+        url = reverse('custom_admin:musician_create')
+        data = {'first_name': 'Мария', 'last_name': 'Иванова', 'instrument': 'piano', 'idempotency_key': 'shared-key'}
+        self.client.post(url, {**data, 'phone': '+375293456789'})
+
+        User.objects.create_user(username='admin2', password='admin123', is_staff=True)
+        other = Client()
+        other.login(username='admin2', password='admin123')
+        other.post(url, {**data, 'phone': '+375293456780'})
+        self.assertTrue(Musician.objects.filter(phone='+375293456780').exists())
+
+    def test_pending_key_is_rejected_without_waiting(self):
+        url = reverse('custom_admin:musician_create')
+        request = RequestFactory().post(url)
+        request.user = self.staff_user
+        state_cache.add(idempotency_cache_key(request, 'busy-key', request_owner(request)), PENDING, 30)
+        response = self.client.post(url, {**self.musician_data, 'idempotency_key': 'busy-key'})
+        self.assertEqual(response.status_code, 409)
+
     def test_musician_update_view_get(self):
         response = self.client.get(
             reverse('custom_admin:musician_update', args=[self.musician.pk])
@@ -815,4 +854,111 @@ class MessageDisplayTests(TestCase):
         messages_list = list(response.context['messages'])
         self.assertEqual(len(messages_list), 1)
         self.assertEqual(str(messages_list[0]), 'Музыкант удален!')
-        self.assertEqual(messages_list[0].tags, 'success')
\ No newline at end of file
+        self.assertEqual(messages_list[0].tags, 'success')
+
+
+class RosterImportViewTests(TestCase):
+    def setUp(self):
+        User.objects.create_user(username='admin', password='admin123', is_staff=True)
+        self.client.login(username='admin', password='admin123')
+
+    def test_upload_imports_rows_and_shows_errors(self):
+        content = (
+            'first_name,last_name,phone,instrument,band_name,genre\n'
+            'Иван,Петров,+375291234567,guitar,Test Band,rock\n'
+            'Пётр,Иванов,12345,guitar,,\n'
+        ).encode('utf-8-sig')
+        response = self.client.post(reverse('custom_admin:roster_import'), {
+            'file': SimpleUploadedFile('roster.csv', content, content_type='text/csv'),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['report'].imported, 1)
+        self.assertEqual(response.context['errors'][0][0], 3)
+        self.assertTrue(BandMembership.objects.filter(band__band_name='Test Band', musician__first_name='Иван').exists())
+
+    def test_missing_columns_are_a_form_error(self):
+        response = self.client.post(reverse('custom_admin:roster_import'), {
+            'file': SimpleUploadedFile('roster.csv', b'name\nX\n', content_type='text/csv'),
+        })
+        self.assertIn('first_name', response.context['form'].errors['file'][0])
+
+
+class AdminListTests(ExplainAssertionsMixin, TestCase):
+    def setUp(self):
+        User.objects.create_user(username='admin', password='admin123', is_staff=True)
+        self.client.login(username='admin', password='admin123')
+        Musician.objects.bulk_create([
+            Musician(
+                first_name=f'Имя{i}', last_name=f'Фамилия{i:02}',
+                phone=f'+3752900000{i:02}', instrument='bass' if i % 2 else 'guitar',
+            )
+            for i in range(60)
+        ])
+
+    def test_musicians_are_paginated_by_cursor(self):
+        url = reverse('custom_admin:musician_list')
+        first = self.client.get(url)
+        page = first.context['page_obj']
+        self.assertEqual(len(page), 50)
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+
+        second = self.client.get(url, {'cursor': page.next_cursor})
+        rest = second.context['page_obj']
+        self.assertEqual(len(rest), 10)
+        self.assertEqual(rest.object_list[0].last_name, 'Фамилия50')
+        self.assertTrue(rest.has_previous())
+
+    def test_search_results_are_paginated(self):
+        url = reverse('custom_admin:musician_list')
+        page = self.client.get(url, {'search': 'Фамилия'}).context['page_obj']
+        self.assertEqual(len(page), 50)
+        rest = self.client.get(url, {'search': 'Фамилия', 'cursor': page.next_cursor}).context['page_obj']
+        self.assertEqual(len(rest), 10)
+        self.assertFalse({m.pk for m in page} & {m.pk for m in rest})
+
+    def test_unknown_sort_falls_back_to_default(self):
+        response = self.client.get(reverse('custom_admin:musician_list'), {'sort': 'phone'})
+        self.assertEqual(response.context['sort'], 'name')
+        self.assertEqual(response.context['page_obj'].object_list[0].last_name, 'Фамилия00')
+
+    def test_choice_filter_and_sort(self):
+        response = self.client.get(
+            reverse('custom_admin:musician_list'), {'instrument': 'bass', 'sort': 'new'}
+        )
+        musicians = response.context['page_obj'].object_list
+        self.assertEqual(len(musicians), 30)
+        self.assertTrue(all(m.instrument == 'bass' for m in musicians))
+        self.assertEqual(musicians[0].last_name, 'Фамилия59')
+
+    def test_invalid_filter_value_is_ignored(self):
+        response = self.client.get(reverse('custom_admin:musician_list'), {'instrument': 'kazoo'})
+        self.assertEqual(len(response.context['page_obj']), 50)
+
+    def test_concert_date_range(self):
+        Concert.objects.create(concert_title='Весенний', venue_address='Минск', concert_date='2024-03-10T19:00:00+03:00')
+        Concert.objects.create(concert_title='Летний', venue_address='Минск', concert_date='2024-07-10T19:00:00+03:00')
+        response = self.client.get(
+            reverse('custom_admin:concert_list'), {'date_from': '2024-03-01', 'date_to': '2024-03-31'}
+        )
+        self.assertEqual([c.concert_title for c in response.context['concerts']], ['Весенний'])
+
+    def test_performances_sorted_by_concert_date(self):
+        band = Band.objects.create(band_name='Pager Band', genre='rock')
+        late = Concert.objects.create(concert_title='Поздний', venue_address='Минск', concert_date='2024-05-01T19:00:00+03:00')
+        early = Concert.objects.create(concert_title='Ранний', venue_address='Минск', concert_date='2024-04-01T19:00:00+03:00')
+        # Концерт в то же время, что и поздний: выступления концертов не перемешиваются.
+        twin = Concert.objects.create(concert_title='Соседний', venue_address='Гомель', concert_date='2024-05-01T19:00:00+03:00')
+        for concert in (late, early, twin):
+            for order in (2, 1):
+                Performance.objects.create(concert=concert, band=band, performance_order=order)
+        response = self.client.get(reverse('custom_admin:performance_list'), {'sort': 'concert_desc'})
+        self.assertEqual(
+            [(p.concert_id, p.performance_order) for p in response.context['performances']],
+            [(twin.pk, 1), (twin.pk, 2), (late.pk, 1), (late.pk, 2), (early.pk, 1), (early.pk, 2)],
+        )
+
+        for sort in ('concert', 'concert_desc'):
+            queryset = PERFORMANCE_LIST.queryset.order_by(*PERFORMANCE_LIST.sorts[sort][1])[:50]
+            self.assertUsesIndex(queryset, 'concerts_date_id_idx')
+            self.assertUsesIndex(queryset, 'performances_concert_idx')
@@ -5,6 +5,7 @@ app_name = 'custom_admin'
 
 urlpatterns = [
     path('', views.admin_dashboard, name='dashboard'),
+    path('roster/import/', views.roster_import, name='roster_import'),
 
     path('musicians/', views.musician_list, name='musician_list'),
     path('musicians/create/', views.musician_create, name='musician_create'),
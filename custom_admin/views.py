@@ -1,11 +1,21 @@
+import io
+
+from django.core.exceptions import ValidationError
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib import messages
 
+from core.conflicts import reserve_rehearsal
+from core.idempotency import idempotent
 from core.models import Musician, Band, Concert, Rehearsal, BandMembership, Performance
+from core.roster import ROSTER_COLUMNS, import_roster
+from core.stats import get_stats
 from custom_admin.forms import (
     MusicianForm, BandForm, ConcertForm, BandMembershipForm,
-    RehearsalForm, PerformanceForm
+    RehearsalForm, PerformanceForm, RosterImportForm
+)
+from custom_admin.lists import (
+    BAND_LIST, CONCERT_LIST, MEMBERSHIP_LIST, MUSICIAN_LIST, PERFORMANCE_LIST, REHEARSAL_LIST
 )
 
 
@@ -15,24 +25,52 @@ def staff_required(user):
 
 @user_passes_test(staff_required)
 def admin_dashboard(request):
-    counts = {
-        'musicians': Musician.objects.count(),
-        'bands': Band.objects.count(),
-        'concerts': Concert.objects.count(),
-        'rehearsals': Rehearsal.objects.count(),
-        'memberships': BandMembership.objects.count(),
-        'performances': Performance.objects.count(),
-    }
-    return render(request, 'custom_admin/dashboard.html', {'counts': counts})
+    stats = get_stats()
+    return render(request, 'custom_admin/dashboard.html', {
+        'counts': stats['counts'],
+        'estimated': stats['estimated'],
+    })
+
+
+ROSTER_ERRORS_SHOWN = 200
+
+
+@user_passes_test(staff_required)
+def roster_import(request):
+    report = None
+    if request.method == 'POST':
+        form = RosterImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            # Файл читается потоком, а не целиком в память.
+            upload = io.TextIOWrapper(form.cleaned_data['file'].file, encoding='utf-8-sig', newline='')
+            try:
+                report = import_roster(upload, dry_run=form.cleaned_data['dry_run'])
+            except ValidationError as e:
+                form.add_error('file', e)
+            except UnicodeDecodeError:
+                form.add_error('file', 'Файл должен быть в кодировке UTF-8')
+            else:
+                if not form.cleaned_data['dry_run'] and report.imported:
+                    messages.success(request, f'Импортировано строк: {report.imported}')
+    else:
+        form = RosterImportForm()
+    return render(request, 'custom_admin/roster_import.html', {
+        'form': form,
+        'report': report,
+        'errors': report.errors[:ROSTER_ERRORS_SHOWN] if report else [],
+        'columns': ROSTER_COLUMNS,
+    })
 
 
 @user_passes_test(staff_required)
 def musician_list(request):
-    musicians = Musician.objects.all().order_by('last_name', 'first_name')
-    return render(request, 'custom_admin/musicians/list.html', {'musicians': musicians})
+    context = MUSICIAN_LIST.get_context(request)
+    context['musicians'] = context['page_obj']
+    return render(request, 'custom_admin/musicians/list.html', context)
 
 
 @user_passes_test(staff_required)
+@idempotent
 def musician_create(request):
     if request.method == 'POST':
         form = MusicianForm(request.POST)
@@ -77,11 +115,13 @@ def musician_delete(request, pk):
 
 @user_passes_test(staff_required)
 def band_list(request):
-    bands = Band.objects.all().order_by('band_name')
-    return render(request, 'custom_admin/bands/list.html', {'bands': bands})
+    context = BAND_LIST.get_context(request)
+    context['bands'] = context['page_obj']
+    return render(request, 'custom_admin/bands/list.html', context)
 
 
 @user_passes_test(staff_required)
+@idempotent
 def band_create(request):
     if request.method == 'POST':
         form = BandForm(request.POST)
@@ -126,11 +166,13 @@ def band_delete(request, pk):
 
 @user_passes_test(staff_required)
 def concert_list(request):
-    concerts = Concert.objects.all().order_by('-concert_date')
-    return render(request, 'custom_admin/concerts/list.html', {'concerts': concerts})
+    context = CONCERT_LIST.get_context(request)
+    context['concerts'] = context['page_obj']
+    return render(request, 'custom_admin/concerts/list.html', context)
 
 
 @user_passes_test(staff_required)
+@idempotent
 def concert_create(request):
     if request.method == 'POST':
         form = ConcertForm(request.POST)
@@ -175,16 +217,17 @@ def concert_delete(request, pk):
 
 @user_passes_test(staff_required)
 def rehearsal_list(request):
-    rehearsals = Rehearsal.objects.select_related('band').order_by('-rehearsal_date')
-    return render(request, 'custom_admin/rehearsals/list.html', {'rehearsals': rehearsals})
+    context = REHEARSAL_LIST.get_context(request)
+    context['rehearsals'] = context['page_obj']
+    return render(request, 'custom_admin/rehearsals/list.html', context)
 
 
 @user_passes_test(staff_required)
+@idempotent
 def rehearsal_create(request):
     if request.method == 'POST':
         form = RehearsalForm(request.POST)
-        if form.is_valid():
-            form.save()
+        if form.is_valid() and reserve_rehearsal(form) is not None:
             messages.success(request, 'Репетиция успешно создана!')
             return redirect('custom_admin:rehearsal_list')
     else:
@@ -200,8 +243,7 @@ def rehearsal_update(request, pk):
     rehearsal = get_object_or_404(Rehearsal, pk=pk)
     if request.method == 'POST':
         form = RehearsalForm(request.POST, instance=rehearsal)
-        if form.is_valid():
-            form.save()
+        if form.is_valid() and reserve_rehearsal(form) is not None:
             messages.success(request, 'Репетиция успешно обновлена!')
             return redirect('custom_admin:rehearsal_list')
     else:
@@ -224,11 +266,13 @@ def rehearsal_delete(request, pk):
 
 @user_passes_test(staff_required)
 def membership_list(request):
-    memberships = BandMembership.objects.select_related('musician', 'band').order_by('-join_date')
-    return render(request, 'custom_admin/membership/list.html', {'memberships': memberships})
+    context = MEMBERSHIP_LIST.get_context(request)
+    context['memberships'] = context['page_obj']
+    return render(request, 'custom_admin/membership/list.html', context)
 
 
 @user_passes_test(staff_required)
+@idempotent
 def membership_create(request):
     if request.method == 'POST':
         form = BandMembershipForm(request.POST)
@@ -273,11 +317,13 @@ def membership_delete(request, pk):
 
 @user_passes_test(staff_required)
 def performance_list(request):
-    performances = Performance.objects.select_related('concert', 'band').order_by('concert__concert_date', 'performance_order')
-    return render(request, 'custom_admin/performances/list.html', {'performances': performances})
+    context = PERFORMANCE_LIST.get_context(request)
+    context['performances'] = context['page_obj']
+    return render(request, 'custom_admin/performances/list.html', context)
 
 
 @user_passes_test(staff_required)
+@idempotent
 def performance_create(request):
     if request.method == 'POST':
         form = PerformanceForm(request.POST)
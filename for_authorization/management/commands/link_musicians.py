@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Musician
+from for_authorization.models import MusicianUser
+
+
+class Command(BaseCommand):
+    help = (
+        'Связывает пользователей без профиля музыканта с музыкантами '
+        'по совпадающему номеру телефона.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Только показать, что будет связано.')
+
+    def handle(self, *args, **options):
+        users = list(
+            MusicianUser.objects.filter(musician__isnull=True)
+            .exclude(phone__isnull=True).exclude(phone='')
+            .only('pk', 'username', 'phone')
+            .order_by('pk')
+        )
+        musicians = dict(
+            Musician.objects.filter(phone__in={user.phone for user in users}, user__isnull=True)
+            .values_list('phone', 'pk')
+        )
+
+        linked, skipped = [], []
+        for user in users:
+            # Связь один к одному: музыкант достаётся первому пользователю с его номером.
+            musician_id = musicians.pop(user.phone, None)
+            if musician_id is None:
+                skipped.append(user)
+                continue
+            user.musician_id = musician_id
+            linked.append(user)
+
+        if options['dry_run']:
+            for user in linked:
+                self.stdout.write(f'{user.username} -> музыкант #{user.musician_id}')
+        else:
+            with transaction.atomic():
+                MusicianUser.objects.bulk_update(linked, ['musician'], batch_size=500)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Связано: {len(linked)}, без совпадений: {len(skipped)}.'
+        ))
@@ -0,0 +1,57 @@
+from django.utils.functional import SimpleLazyObject
+
+from core.models import Musician
+
+SESSION_KEY = '_musician_id'
+
+
+def find_musician_id(user):
+    """
+    Связанный музыкант, для ещё не связанных пользователей — поиск по
+    телефону среди музыкантов, которых ещё никто не занял.
+    """
+    if user.musician_id:
+        return user.musician_id
+    if not user.phone:
+        return None
+    return Musician.objects.filter(phone=user.phone, user__isnull=True).values_list('pk', flat=True).first()
+
+
+def resolve_musician(request):
+    """
+    Профиль музыканта текущего пользователя или None.
+
+    Найденный id хранится в сессии вместе с тем, от чего он зависит
+    (пользователь, связь, телефон), и не ищется заново на каждом запросе.
+    Отсутствие музыканта не кэшируется: его могут добавить в любой момент.
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return None
+
+    depends_on = [user.pk, user.musician_id, user.phone]
+    cached = request.session.get(SESSION_KEY)
+    if cached and cached[:3] == depends_on:
+        musician_id = cached[3]
+    else:
+        musician_id = find_musician_id(user)
+        if musician_id is not None:
+            request.session[SESSION_KEY] = depends_on + [musician_id]
+    if musician_id is None:
+        return None
+    musicians = Musician.objects.filter(pk=musician_id)
+    if not user.musician_id:
+        # Id из сессии мог устареть: музыканта успели связать с другим.
+        musicians = musicians.filter(user__isnull=True)
+    return musicians.first()
+
+
+class CurrentMusicianMiddleware:
+    """request.musician — музыкант пользователя, определяется при первом обращении."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.musician = SimpleLazyObject(lambda: resolve_musician(request))
+        return self.get_response(request)
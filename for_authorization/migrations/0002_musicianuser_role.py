@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 05:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('for_authorization', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='musicianuser',
+            name='role',
+            field=models.CharField(choices=[('musician', 'Musician'), ('admin', 'Admin')], default='musician', max_length=20),
+        ),
+    ]
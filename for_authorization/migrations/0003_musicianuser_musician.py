@@ -0,0 +1,20 @@
+# Generated by Django 5.2.9 on 2026-10-18 06:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_upcoming_lineups'),
+        ('for_authorization', '0002_musicianuser_role'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='musicianuser',
+            name='musician',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='user', to='core.musician', verbose_name='Музыкант'),
+        ),
+    ]
@@ -42,6 +42,15 @@ class MusicianUser(AbstractUser):
         verbose_name=_('Инструмент')
     )
     
+    musician = models.OneToOneField(
+        'core.Musician',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='user',
+        verbose_name=_('Музыкант')
+    )
+    
     bio = models.TextField(
         blank=True,
         null=True,
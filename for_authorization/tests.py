@@ -1,7 +1,14 @@
+from io import StringIO
+
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.contrib.messages import get_messages
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.models import Musician
+from for_authorization.middleware import SESSION_KEY, resolve_musician
 
 User = get_user_model()
 
@@ -138,4 +145,64 @@ class FormsTests(TestCase):
             'username': 'incomplete',
         })
         self.assertEqual(response.status_code, 200)
-        self.assertFalse(User.objects.filter(username='incomplete').exists())
\ No newline at end of file
+        self.assertFalse(User.objects.filter(username='incomplete').exists())
+
+
+class MusicianLinkTests(TestCase):
+    def setUp(self):
+        self.musician = Musician.objects.create(
+            first_name='Ivan', last_name='Petrov', phone='+375293333333', instrument='bass'
+        )
+
+    def test_registration_does_not_link_musician_by_phone(self):
+        # Телефон при регистрации не подтверждается: связь ставит только link_musicians.
+        self.client.post(reverse('register'), {
+            'username': 'linked',
+            'email': 'linked@example.com',
+            'password1': 'Sup3rPass!word',
+            'password2': 'Sup3rPass!word',
+            'phone': '+375293333333',
+        })
+        self.assertIsNone(User.objects.get(username='linked').musician_id)
+
+    def test_link_musicians_command(self):
+        first = User.objects.create_user(username='first', password='pass', phone='+375293333333')
+        second = User.objects.create_user(username='second', password='pass', phone='+375293333333')
+        stranger = User.objects.create_user(username='stranger', password='pass', phone='+375290000000')
+
+        call_command('link_musicians', '--dry-run', stdout=StringIO())
+        first.refresh_from_db()
+        self.assertIsNone(first.musician_id)
+
+        call_command('link_musicians', stdout=StringIO())
+        for user in (first, second, stranger):
+            user.refresh_from_db()
+        self.assertEqual(first.musician, self.musician)
+        self.assertIsNone(second.musician_id)
+        self.assertIsNone(stranger.musician_id)
+
+    def test_musician_id_is_cached_in_session(self):
+        User.objects.create_user(username='player', password='pass', phone='+375293333333')
+        self.client.login(username='player', password='pass')
+        self.client.get(reverse('groups:band_list'))
+        self.assertEqual(self.client.session[SESSION_KEY][3], self.musician.pk)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('groups:band_list'))
+        phone_lookups = [q for q in ctx.captured_queries if '"musicians"."phone" =' in q['sql']]
+        self.assertEqual(phone_lookups, [])
+
+    def test_phone_does_not_match_musician_linked_to_another_user(self):
+        User.objects.create_user(username='owner', password='pass', musician=self.musician)
+        User.objects.create_user(username='intruder', password='pass', phone='+375293333333')
+        self.client.login(username='intruder', password='pass')
+        request = self.client.get(reverse('groups:band_list')).wsgi_request
+        self.assertIsNone(resolve_musician(request))
+
+    def test_cached_phone_match_expires_when_musician_is_linked(self):
+        User.objects.create_user(username='player', password='pass', phone='+375293333333')
+        self.client.login(username='player', password='pass')
+        self.client.get(reverse('groups:band_list'))
+        User.objects.create_user(username='owner', password='pass', musician=self.musician)
+        request = self.client.get(reverse('groups:band_list')).wsgi_request
+        self.assertIsNone(resolve_musician(request))
@@ -2,6 +2,8 @@ from django import forms
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from core.models import Band, BandMembership, Musician
+from core.autocomplete import exclude_band_members
+from core.widgets import AutocompleteSelect
 
 
 class BandForm(forms.ModelForm):
@@ -46,7 +48,7 @@ class BandForm(forms.ModelForm):
 class AddMemberForm(forms.ModelForm):
     musician = forms.ModelChoiceField(
         queryset=Musician.objects.all(),
-        widget=forms.Select(attrs={'class': 'form-control'}),
+        widget=AutocompleteSelect('musicians'),
         label='Музыкант'
     )
     join_date = forms.DateField(
@@ -63,19 +65,21 @@ class AddMemberForm(forms.ModelForm):
         self.band = kwargs.pop('band', None)
         super().__init__(*args, **kwargs)
         if self.band:
-            existing_members = self.band.bandmembership_set.values_list('musician_id', flat=True)
-            self.fields['musician'].queryset = Musician.objects.exclude(
-                musician_id__in=existing_members
-            )
+            # Выбранный музыкант проверяется одним запросом с NOT EXISTS:
+            # участник группы не найдётся, и поле вернёт ошибку.
+            self.fields['musician'].queryset = exclude_band_members(Musician.objects.all(), self.band.pk)
+            self.fields['musician'].widget.params = {'exclude-band': self.band.pk}
     
     def clean(self):
         cleaned_data = super().clean()
-        musician = cleaned_data.get('musician')
         join_date = cleaned_data.get('join_date')
-        
-        if musician and self.band:
-            if BandMembership.objects.filter(band=self.band, musician=musician).exists():
-                raise ValidationError('Этот музыкант уже состоит в группе')
+
+        # Недопустимый выбор — это и удалённый музыкант, и уже участник:
+        # причину уточняем отдельным запросом только при ошибке.
+        if self.band and self.has_error('musician', 'invalid_choice'):
+            musician_id = str(self.data.get(self.add_prefix('musician'), ''))
+            if musician_id.isdigit() and self.band.bandmembership_set.filter(musician_id=musician_id).exists():
+                self.errors['musician'] = self.error_class(['Этот музыкант уже состоит в группе'])
         
         if join_date and join_date > timezone.now().date():
             raise ValidationError('Дата вступления не может быть в будущем')
@@ -4,6 +4,9 @@ from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
 from core.models import Band, Musician, BandMembership
 
 User = get_user_model()
@@ -58,6 +61,24 @@ class GroupsAccessTests(TestCase):
         self.assertContains(response, "Rock Band")
         self.assertContains(response, "Pop Band")
 
+    def test_band_members_conditional_get(self):
+        self.client.login(username='manager', password='password')
+        url = reverse('groups:band_members', args=[self.band_rock.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.core_musician.instrument = 'bass'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.core_musician.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_band_members_etag_differs_per_user(self):
+        url = reverse('groups:band_members', args=[self.band_rock.pk])
+        self.client.login(username='manager', password='password')
+        etag = self.client.get(url)['ETag']
+        self.client.login(username='musician', password='password')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
     def test_manager_create_band_with_logo(self):
         self.client.login(username='manager', password='password')
         
@@ -91,4 +112,48 @@ class GroupsAccessTests(TestCase):
         delete_url = reverse('groups:band_delete', args=[self.band_pop.pk])
         response = self.client.post(delete_url)
         self.assertEqual(response.status_code, 302)
-        self.assertFalse(Band.objects.filter(pk=self.band_pop.pk).exists())
\ No newline at end of file
+        self.assertFalse(Band.objects.filter(pk=self.band_pop.pk).exists())
+
+
+class MemberCountTests(TestCase):
+    def setUp(self):
+        self.rock = Band.objects.create(band_name="Rock Band", genre="rock")
+        self.jazz = Band.objects.create(band_name="Jazz Band", genre="jazz")
+        self.musicians = [
+            Musician.objects.create(first_name=f'M{i}', last_name='Test', phone=f'+37529000000{i}', instrument='bass')
+            for i in range(3)
+        ]
+
+    def counts(self):
+        return dict(Band.objects.values_list('band_name', 'member_count'))
+
+    def test_trigger_keeps_member_count_in_sync(self):
+        BandMembership.objects.bulk_create(
+            BandMembership(band=self.rock, musician=musician) for musician in self.musicians
+        )
+        self.assertEqual(self.counts(), {"Rock Band": 3, "Jazz Band": 0})
+
+        membership = BandMembership.objects.filter(band=self.rock).first()
+        membership.band = self.jazz
+        membership.save()
+        membership.save()
+        self.assertEqual(self.counts(), {"Rock Band": 2, "Jazz Band": 1})
+
+        BandMembership.objects.filter(band=self.rock).delete()
+        annotated = dict(
+            Band.objects.annotate(members=Count('bandmembership')).values_list('band_name', 'members')
+        )
+        self.assertEqual(self.counts(), annotated)
+
+    def test_band_list_sorts_by_size_without_count_queries(self):
+        BandMembership.objects.create(band=self.jazz, musician=self.musicians[0])
+        User.objects.create_user(username='boss', password='password', is_staff=True)
+        self.client.login(username='boss', password='password')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('groups:band_list'), {'sort': 'size'})
+        self.assertEqual([band.band_name for band in response.context['bands']], ["Jazz Band", "Rock Band"])
+        self.assertFalse([q for q in ctx.captured_queries if '"band_membership"."band_id" =' in q['sql']])
+
+        response = self.client.get(reverse('groups:band_list'), {'min_members': 1})
+        self.assertEqual([band.band_name for band in response.context['bands']], ["Jazz Band"])
@@ -2,20 +2,21 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
-from django.db.models import Q
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 
-from core.models import Band, BandMembership, Musician
+from core.conditional import condition_on_versions
+from core.models import Band, BandMembership
+from core.search import BAND_SEARCH, trigram_threshold
+from core.stats import get_stats
+from core.views import int_param
 from .forms import BandForm, AddMemberForm
 
-def get_current_musician(user):
-    if not user.is_authenticated or not user.phone:
-        return None
-    try:
-        return Musician.objects.get(phone=user.phone)
-    except Musician.DoesNotExist:
-        return None
+# Сортировки списка групп; размер группы берётся из bands.member_count без JOIN.
+BAND_ORDERINGS = {
+    'name': ('band_name', 'band_id'),
+    'size': ('-member_count', 'band_id'),
+}
 
 def is_manager(user):
     return user.is_authenticated and user.is_staff
@@ -30,33 +31,47 @@ class BandListView(LoginRequiredMixin, ListView):
         if not request.user.is_authenticated:
             return self.handle_no_permission()
         
-        if not request.user.is_staff and get_current_musician(request.user) is None:
+        # request.musician определяется один раз за запрос (CurrentMusicianMiddleware).
+        if not request.user.is_staff and not request.musician:
             messages.error(request, "У вас нет прав для просмотра списка групп. Требуется профиль музыканта.")
             return redirect('home')
             
         return super().dispatch(request, *args, **kwargs)
 
+    def get(self, request, *args, **kwargs):
+        if not request.GET.get('search', '').strip():
+            return super().get(request, *args, **kwargs)
+        # Страница выбирает группы при отрисовке шаблона — рендерим внутри
+        # блока, где действует порог поиска.
+        with trigram_threshold():
+            return super().get(request, *args, **kwargs).render()
+
+    def get_ordering_key(self):
+        sort = self.request.GET.get('sort', '')
+        return sort if sort in BAND_ORDERINGS else 'name'
+
     def get_queryset(self):
-        queryset = super().get_queryset().order_by('band_name')
+        ordering = BAND_ORDERINGS[self.get_ordering_key()]
+        queryset = super().get_queryset().order_by(*ordering)
         user = self.request.user
         
         if not user.is_staff:
-            musician = get_current_musician(user)
+            musician = self.request.musician
             if musician:
-                queryset = queryset.filter(bandmembership__musician=musician)
+                queryset = queryset.filter(bandmembership__musician_id=musician.pk)
             else:
                 queryset = queryset.none()
 
-        search_query = self.request.GET.get('search', '')
-        if search_query:
-            queryset = queryset.filter(
-                Q(band_name__icontains=search_query) |
-                Q(genre__icontains=search_query)
-            )
-        
         genre_filter = self.request.GET.get('genre', '')
         if genre_filter:
             queryset = queryset.filter(genre=genre_filter)
+
+        min_members = int_param(self.request, 'min_members', 0)
+        if min_members:
+            queryset = queryset.filter(member_count__gte=min_members)
+
+        search_query = self.request.GET.get('search', '')
+        queryset = BAND_SEARCH.search(queryset, search_query, ordering)
             
         return queryset.distinct()
 
@@ -65,11 +80,14 @@ class BandListView(LoginRequiredMixin, ListView):
         
         context['search_query'] = self.request.GET.get('search', '')
         context['genre_filter'] = self.request.GET.get('genre', '')
-        context['genres'] = Band.objects.values_list('genre', flat=True).distinct().order_by('genre')
-        
-        context['total_bands'] = Band.objects.count()
-        context['total_genres'] = Band.objects.values('genre').distinct().count()
-        context['total_musicians'] = Musician.objects.count()
+        context['sort'] = self.get_ordering_key()
+        context['min_members'] = int_param(self.request, 'min_members', 0) or ''
+
+        stats = get_stats()
+        context['genres'] = stats['genres']
+        context['total_bands'] = stats['counts']['bands']
+        context['total_genres'] = stats['total_genres']
+        context['total_musicians'] = stats['counts']['musicians']
 
         return context
 
@@ -127,17 +145,18 @@ class BandDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         return super().form_valid(form)
 
 @login_required
+@condition_on_versions('bands', 'memberships', 'musicians')
 def band_members(request, pk):
     band = get_object_or_404(Band, pk=pk)
     user = request.user
     
     if not user.is_staff:
-        musician = get_current_musician(user)
+        musician = request.musician
         if not musician:
             messages.error(request, "Доступ запрещен.")
             return redirect('home')
         
-        if not BandMembership.objects.filter(band=band, musician=musician).exists():
+        if not BandMembership.objects.filter(band=band, musician_id=musician.pk).exists():
             messages.error(request, "Вы не являетесь участником этой группы.")
             return redirect('groups:band_list')
 